@@ -80,6 +80,21 @@ class Settings(BaseSettings):
     call_burst_threshold: int = Field(default=5, description="Calls in 15 minutes")
     call_burst_window: int = Field(default=15, description="Time window in minutes")
     
+    # Risk scoring execution
+    risk_scoring_parallel: bool = Field(default=False, description="Run per-suspect pattern detection in a thread pool")
+    risk_scoring_workers: int = Field(default=1, description="Worker processes for pattern detection (1 disables the process pool)")
+    min_rows_for_scoring: int = Field(default=0, description="Suspects with fewer CDR rows are reported without pattern detection (0 scores every suspect)")
+    
+    # Temporal analysis execution
+    temporal_analysis_parallel: bool = Field(default=False, description="Analyze suspects' temporal patterns in a thread pool")
+    
+    # Behavior pattern execution
+    behavior_analysis_parallel: bool = Field(default=False, description="Run the comprehensive analysis' detectors in a thread pool")
+    behavior_analysis_workers: int = Field(default=1, description="Worker processes for per-dump group coordination scans (1 disables the process pool)")
+    
+    # Cross-reference execution
+    cross_reference_workers: int = Field(default=1, description="Worker processes for (dump, CDR/IPDR) link passes (1 disables the process pool)")
+    
     # Provider patterns (service codes)
     provider_patterns: List[str] = Field(
         default=[
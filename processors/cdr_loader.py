@@ -146,9 +146,12 @@ class CDRLoader:
         # Identify provider messages
         df['is_provider_message'] = df[self.column_mapping['b_party']].apply(self._is_provider_message)
         
-        # Extract hour for temporal analysis
-        df['hour'] = pd.to_datetime(df['datetime']).dt.hour
-        df['day_of_week'] = pd.to_datetime(df['datetime']).dt.day_name()
+        # Extract hour for temporal analysis (int8 unless unparsed rows leave NaN;
+        # day names are dictionary-encoded)
+        timestamps = pd.to_datetime(df['datetime'])
+        hour = timestamps.dt.hour
+        df['hour'] = hour.astype('int8') if hour.notna().all() else hour
+        df['day_of_week'] = timestamps.dt.day_name().astype('category')
         
         # Clean duration (handle missing values)
         duration_col = self.column_mapping['duration']
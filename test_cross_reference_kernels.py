@@ -0,0 +1,100 @@
+"""
+Test the cross-reference time-window kernels against brute-force joins
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+
+from tower_analysis_tools.cross_reference_tool import _window_pairs, _link_by_time
+
+NAT = np.iinfo(np.int64).min
+
+def brute_force_pairs(left_keys, left_ts, right_keys, right_ts, tol_ns):
+    """Every (left, right) pair with equal keys and times at most tol_ns apart, by nested loops"""
+    return sorted(
+        (i, j)
+        for i in range(len(left_keys))
+        for j in range(len(right_keys))
+        if left_keys[i] == right_keys[j] and abs(int(left_ts[i]) - int(right_ts[j])) <= tol_ns
+    )
+
+def brute_force_links(left_keys, left_ts, right_keys, right_ts, tol_ns):
+    """Brute-force pairs, skipping missing numbers (-1) and NaT as the link functions do"""
+    return [
+        (i, j) for i, j in brute_force_pairs(left_keys, left_ts, right_keys, right_ts, tol_ns)
+        if left_keys[i] >= 0 and left_ts[i] != NAT and right_ts[j] != NAT
+    ]
+
+def test_window_pairs():
+    """Compare _window_pairs with a nested-loop join on random, tie-heavy inputs"""
+
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        n_left, n_right = rng.integers(0, 30, 2)
+        # Few keys and a narrow time range give many duplicate keys and timestamps
+        left_keys = rng.integers(0, 4, n_left).astype(np.int32)
+        right_keys = rng.integers(0, 4, n_right).astype(np.int32)
+        left_ts = rng.integers(0, 50, n_left).astype(np.int64)
+        right_ts = rng.integers(0, 50, n_right).astype(np.int64)
+        tol_ns = int(rng.integers(0, 6))
+
+        left_idx, right_idx = _window_pairs(left_keys, left_ts, right_keys, right_ts, tol_ns)
+
+        assert sorted(zip(left_idx.tolist(), right_idx.tolist())) == brute_force_pairs(
+            left_keys, left_ts, right_keys, right_ts, tol_ns
+        )
+
+    # Empty inputs on either side
+    empty_keys, empty_ts = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+    some_keys, some_ts = np.array([1, 2], dtype=np.int32), np.array([10, 20], dtype=np.int64)
+    for args in [(empty_keys, empty_ts, empty_keys, empty_ts),
+                 (empty_keys, empty_ts, some_keys, some_ts),
+                 (some_keys, some_ts, empty_keys, empty_ts)]:
+        left_idx, right_idx = _window_pairs(*args, 5)
+        assert len(left_idx) == 0 and len(right_idx) == 0
+
+    print("✓ _window_pairs matches the nested-loop join")
+
+def test_link_by_time():
+    """Compare _link_by_time with a nested-loop join, including missing numbers and NaT"""
+
+    rng = np.random.default_rng(1)
+    base = pd.Timestamp('2024-03-01')
+    for _ in range(300):
+        n_left, n_right = rng.integers(0, 25, 2)
+        left_keys = rng.integers(-1, 3, n_left).astype(np.int32)
+        right_keys = rng.integers(-1, 3, n_right).astype(np.int32)
+        left_ts = base.value + rng.integers(0, 40, n_left).astype(np.int64) * 10**9
+        right_ts = base.value + rng.integers(0, 40, n_right).astype(np.int64) * 10**9
+        left_ts[rng.random(n_left) < 0.1] = NAT
+        right_ts[rng.random(n_right) < 0.1] = NAT
+        tol_ns = int(rng.integers(0, 6)) * 10**9
+
+        left = pd.DataFrame({
+            'left_row': np.arange(n_left),
+            'number_code': left_keys,
+            'left_time': left_ts.view('datetime64[ns]'),
+        })
+        right = pd.DataFrame({
+            'right_row': np.arange(n_right),
+            'number_code': right_keys,
+            'right_time': right_ts.view('datetime64[ns]'),
+        })
+
+        linked = _link_by_time(left, right, 'left_time', 'right_time', np.int64(tol_ns))
+
+        # Links come back in left row order, then right row order
+        assert list(zip(linked['left_row'].tolist(), linked['right_row'].tolist())) == brute_force_links(
+            left_keys, left_ts, right_keys, right_ts, tol_ns
+        )
+
+    print("✓ _link_by_time matches the nested-loop join")
+
+if __name__ == "__main__":
+    test_window_pairs()
+    test_link_by_time()
@@ -0,0 +1,50 @@
+"""
+Test the temporal call-burst kernel against a brute-force scan
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from tools.temporal_analysis import _scan_bursts
+
+def brute_force_bursts(ts, window_ns, threshold, limit):
+    """Scan bursts start by start: a window holds every call from the first one
+    sharing the start time up to the last one within window_ns of it"""
+    found = []
+    i = 0
+    while i < len(ts) and len(found) < limit:
+        lo = min(j for j in range(len(ts)) if ts[j] == ts[i])
+        hi = max(j for j in range(len(ts)) if ts[j] <= ts[i] + window_ns) + 1
+        if hi - lo >= threshold:
+            found.append((i, lo, hi))
+            # Skip past this burst
+            i += hi - lo
+        else:
+            i += 1
+    return found
+
+def test_scan_bursts():
+    """Compare _scan_bursts with the brute-force scan on sorted, tie-heavy timestamps"""
+
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        n = int(rng.integers(0, 40))
+        # A narrow time range gives many duplicate timestamps
+        ts = np.sort(rng.integers(0, 60, n)).astype(np.int64)
+        window_ns = int(rng.integers(0, 10))
+        threshold = int(rng.integers(1, 6))
+        limit = int(rng.integers(1, 6))
+
+        assert _scan_bursts(ts, window_ns, threshold, limit) == brute_force_bursts(ts, window_ns, threshold, limit)
+
+    # No calls, no bursts
+    assert _scan_bursts(np.empty(0, dtype=np.int64), 5, 1, 5) == []
+
+    print("✓ _scan_bursts matches the brute-force scan")
+
+if __name__ == "__main__":
+    test_scan_bursts()
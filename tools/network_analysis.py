@@ -3,11 +3,11 @@ Network Analysis Tool for CDR Intelligence
 Analyzes connections between suspects and identifies criminal networks
 """
 
-from typing import Dict, Optional, Any, List, Set, Tuple, Type
+import io
+from typing import Dict, Optional, Any, Type
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 import pandas as pd
-import networkx as nx
 from collections import defaultdict
 from loguru import logger
 
@@ -75,14 +75,14 @@ class NetworkAnalysisTool(BaseTool):
             'suspect_numbers': {},  # Maps suspect names to their phone numbers
             'all_contacts': defaultdict(set),  # All contacts for each suspect
             'contact_to_suspects': defaultdict(set),  # Reverse mapping
-            'call_counts': defaultdict(lambda: defaultdict(int)),  # Call frequency between numbers
-            'graph': nx.Graph()  # NetworkX graph for analysis
+            'call_counts': defaultdict(lambda: defaultdict(int))  # Call frequency between numbers
         }
         
         # Extract data from each suspect
+        contact_frames = []
         for suspect_name, df in self.cdr_data.items():
             # Filter provider messages
-            df_filtered = df[~df.get('is_provider_message', False)].copy()
+            df_filtered = df[~df.get('is_provider_message', False)]
             
             # Get suspect's phone number from filename
             parts = suspect_name.split('_')
@@ -92,19 +92,25 @@ class NetworkAnalysisTool(BaseTool):
             
             # Collect all contacts
             if 'b_party_clean' in df_filtered.columns:
-                contacts = df_filtered['b_party_clean'].dropna().unique()
-                network_data['all_contacts'][suspect_name] = set(contacts)
-                
-                # Build reverse mapping
-                for contact in contacts:
-                    network_data['contact_to_suspects'][contact].add(suspect_name)
+                contact_frames.append(pd.DataFrame({
+                    'suspect': suspect_name,
+                    'b_party_clean': df_filtered['b_party_clean'].dropna().values
+                }))
                 
                 # Count calls
                 contact_counts = df_filtered['b_party_clean'].value_counts()
                 for contact, count in contact_counts.items():
                     network_data['call_counts'][suspect_name][contact] = count
-                    # Add to graph
-                    network_data['graph'].add_edge(suspect_name, contact, weight=count)
+        
+        # Forward and reverse contact mappings in one groupby each
+        if contact_frames:
+            all_calls_df = pd.concat(contact_frames, ignore_index=True)
+            network_data['all_contacts'].update(
+                all_calls_df.groupby('suspect', sort=False)['b_party_clean'].agg(set).to_dict()
+            )
+            network_data['contact_to_suspects'].update(
+                all_calls_df.groupby('b_party_clean', sort=False)['suspect'].agg(set).to_dict()
+            )
         
         return network_data
     
@@ -193,15 +199,13 @@ class NetworkAnalysisTool(BaseTool):
             'potential_handlers': []
         }
         
-        graph = network_data['graph']
-        
         # Calculate centrality metrics for suspects only
         suspect_names = list(self.cdr_data.keys())
         
         # Degree centrality (number of unique contacts)
         degree_centrality = {}
         for suspect in suspect_names:
-            if suspect in graph:
+            if network_data['call_counts'].get(suspect):
                 degree_centrality[suspect] = len(network_data['all_contacts'][suspect])
         
         # Sort by centrality
@@ -242,53 +246,55 @@ class NetworkAnalysisTool(BaseTool):
         time_window = 300  # 5 minutes in seconds
         
         # Get all calls with timestamps from all suspects
-        all_calls = []
+        call_frames = []
         for suspect, df in self.cdr_data.items():
             # Filter provider messages
-            df_filtered = df[~df.get('is_provider_message', False)].copy()
+            df_filtered = df[~df.get('is_provider_message', False)]
             
             if 'datetime' in df_filtered.columns and settings.cdr_columns['call_type'] in df_filtered.columns:
-                for _, row in df_filtered.iterrows():
-                    all_calls.append({
-                        'suspect': suspect,
-                        'timestamp': row['datetime'],
-                        'type': row[settings.cdr_columns['call_type']],
-                        'b_party': row.get('b_party_clean', '')
-                    })
-        
-        # Sort by timestamp
-        all_calls.sort(key=lambda x: x['timestamp'])
+                call_frames.append(pd.DataFrame({
+                    'suspect': suspect,
+                    'datetime': pd.to_datetime(df_filtered['datetime']).values,
+                    'type': df_filtered[settings.cdr_columns['call_type']].values
+                }))
+        
+        if not call_frames:
+            return sync_analysis
+        
+        # Sort by timestamp once and work on int64 nanoseconds from here on
+        all_calls_df = pd.concat(call_frames, ignore_index=True)
+        all_calls_df = all_calls_df.dropna(subset=['datetime'])
+        all_calls_df = all_calls_df.sort_values('datetime', kind='stable', ignore_index=True)
+        
+        timestamps = all_calls_df['datetime']
+        ts_i8 = timestamps.values.astype('datetime64[ns]').view('int64').tolist()
+        call_suspects = all_calls_df['suspect'].tolist()
+        window_ns = time_window * 1_000_000_000
+        n_calls = len(ts_i8)
         
         # Find synchronized activities
         processed_indices = set()
         
-        for i in range(len(all_calls)):
+        for i in range(n_calls):
             if i in processed_indices:
                 continue
-                
-            current = all_calls[i]
-            synchronized = [current]
-            suspects_in_window = {current['suspect']}
+            
+            synchronized = [i]
+            suspects_in_window = {call_suspects[i]}
             
             # Check calls within time window
             j = i + 1
-            while j < len(all_calls):
-                next_call = all_calls[j]
-                time_diff = (next_call['timestamp'] - current['timestamp']).total_seconds()
-                
-                if time_diff <= time_window:
-                    if next_call['suspect'] not in suspects_in_window:
-                        synchronized.append(next_call)
-                        suspects_in_window.add(next_call['suspect'])
-                        processed_indices.add(j)
-                else:
-                    break
+            while j < n_calls and ts_i8[j] - ts_i8[i] <= window_ns:
+                if call_suspects[j] not in suspects_in_window:
+                    synchronized.append(j)
+                    suspects_in_window.add(call_suspects[j])
+                    processed_indices.add(j)
                 j += 1
             
             # Record if multiple suspects were active
             if len(suspects_in_window) >= 2:
                 sync_analysis['sync_patterns'].append({
-                    'timestamp': current['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
+                    'timestamp': timestamps.iloc[i].strftime('%Y-%m-%d %H:%M:%S'),
                     'suspects': list(suspects_in_window),
                     'suspect_count': len(suspects_in_window),
                     'call_count': len(synchronized),
@@ -320,115 +326,111 @@ class NetworkAnalysisTool(BaseTool):
     
     def _format_network_analysis(self, analysis: Dict, query: str) -> str:
         """Format network analysis results"""
-        output = []
+        buf = io.StringIO()
         
-        output.append("🌐 NETWORK ANALYSIS RESULTS")
-        output.append("=" * 50)
+        buf.write("🌐 NETWORK ANALYSIS RESULTS\n")
+        buf.write("=" * 50 + "\n")
         
         # Format based on analysis type
         if isinstance(analysis, dict) and 'connections' in analysis:
             # Comprehensive analysis
-            self._format_connections(output, analysis['connections'])
-            self._format_common_contacts(output, analysis['common_contacts'])
-            self._format_hierarchy(output, analysis['hierarchy'])
+            self._format_connections(buf, analysis['connections'])
+            self._format_common_contacts(buf, analysis['common_contacts'])
+            self._format_hierarchy(buf, analysis['hierarchy'])
             if 'synchronized_calling' in analysis:
-                self._format_synchronized_calling(output, analysis['synchronized_calling'])
+                self._format_synchronized_calling(buf, analysis['synchronized_calling'])
         elif 'direct_connections' in analysis:
-            self._format_connections(output, analysis)
+            self._format_connections(buf, analysis)
         elif 'shared_contacts' in analysis:
-            self._format_common_contacts(output, analysis)
+            self._format_common_contacts(buf, analysis)
         elif 'central_figures' in analysis:
-            self._format_hierarchy(output, analysis)
+            self._format_hierarchy(buf, analysis)
         
-        return "\n".join(output)
+        return buf.getvalue()
     
-    def _format_connections(self, output: List[str], connections: Dict):
+    def _format_connections(self, buf: io.StringIO, connections: Dict):
         """Format inter-suspect connections"""
-        output.append("\n🔗 INTER-SUSPECT CONNECTIONS")
-        output.append("-" * 30)
+        buf.write("\n🔗 INTER-SUSPECT CONNECTIONS\n")
+        buf.write("-" * 30 + "\n")
         
         if connections['direct_connections']:
-            output.append("Direct connections found:")
+            buf.write("Direct connections found:\n")
             for conn in connections['direct_connections']:
-                output.append(f"  • {conn['from']} ←→ {conn['to']} ({conn['calls']} calls)")
-            output.append("  ⚠️ Direct communication between suspects detected!")
+                buf.write(f"  • {conn['from']} ←→ {conn['to']} ({conn['calls']} calls)\n")
+            buf.write("  ⚠️ Direct communication between suspects detected!\n")
         else:
-            output.append("  ✓ No direct connections between suspects")
-            output.append("  → Suggests compartmentalized structure or intermediaries")
+            buf.write("  ✓ No direct connections between suspects\n")
+            buf.write("  → Suggests compartmentalized structure or intermediaries\n")
         
         if connections['isolated_suspects']:
-            output.append(f"\nIsolated suspects: {', '.join(connections['isolated_suspects'][:5])}")
+            buf.write(f"\nIsolated suspects: {', '.join(connections['isolated_suspects'][:5])}\n")
     
-    def _format_common_contacts(self, output: List[str], common: Dict):
+    def _format_common_contacts(self, buf: io.StringIO, common: Dict):
         """Format common contacts analysis"""
-        output.append("\n👥 COMMON CONTACTS")
-        output.append("-" * 30)
+        buf.write("\n👥 COMMON CONTACTS\n")
+        buf.write("-" * 30 + "\n")
         
         if common['shared_contacts']:
-            output.append(f"Found {len(common['shared_contacts'])} shared contacts")
+            buf.write(f"Found {len(common['shared_contacts'])} shared contacts\n")
             
             # Show top shared contacts
             for contact in common['shared_contacts'][:5]:
                 suspects_str = ', '.join(contact['shared_by'][:3])
                 if contact['suspect_count'] > 3:
                     suspects_str += f" +{contact['suspect_count']-3} more"
-                output.append(f"  • ***{contact['contact']}: shared by {contact['suspect_count']} suspects")
-                output.append(f"    ({suspects_str})")
-                output.append(f"    Total calls: {contact['total_calls']}")
+                buf.write(f"  • ***{contact['contact']}: shared by {contact['suspect_count']} suspects\n")
+                buf.write(f"    ({suspects_str})\n")
+                buf.write(f"    Total calls: {contact['total_calls']}\n")
         
         if common['potential_intermediaries']:
-            output.append("\n🚨 POTENTIAL INTERMEDIARIES/HANDLERS:")
+            buf.write("\n🚨 POTENTIAL INTERMEDIARIES/HANDLERS:\n")
             for interm in common['potential_intermediaries'][:3]:
-                output.append(f"  • ***{interm['contact']}: connected to {interm['suspect_count']} suspects")
+                buf.write(f"  • ***{interm['contact']}: connected to {interm['suspect_count']} suspects\n")
     
-    def _format_hierarchy(self, output: List[str], hierarchy: Dict):
+    def _format_hierarchy(self, buf: io.StringIO, hierarchy: Dict):
         """Format network hierarchy analysis"""
-        output.append("\n📊 NETWORK HIERARCHY")
-        output.append("-" * 30)
+        buf.write("\n📊 NETWORK HIERARCHY\n")
+        buf.write("-" * 30 + "\n")
         
         if hierarchy['central_figures']:
-            output.append("Central figures by connectivity:")
+            buf.write("Central figures by connectivity:\n")
             for i, figure in enumerate(hierarchy['central_figures'][:5], 1):
-                output.append(f"  {i}. {figure['suspect']}")
-                output.append(f"     Contacts: {figure['unique_contacts']}, Calls: {figure['total_calls']}")
+                buf.write(f"  {i}. {figure['suspect']}\n")
+                buf.write(f"     Contacts: {figure['unique_contacts']}, Calls: {figure['total_calls']}\n")
         
         if hierarchy['potential_handlers']:
-            output.append("\n⚠️ POTENTIAL HANDLERS DETECTED:")
+            buf.write("\n⚠️ POTENTIAL HANDLERS DETECTED:\n")
             for handler in hierarchy['potential_handlers']:
-                output.append(f"  • {handler['suspect']}: {handler['unique_contacts']} contacts")
-                output.append(f"    ({handler['single_call_percentage']}% single calls - distribution pattern)")
-        
-        return output
+                buf.write(f"  • {handler['suspect']}: {handler['unique_contacts']} contacts\n")
+                buf.write(f"    ({handler['single_call_percentage']}% single calls - distribution pattern)\n")
     
-    def _format_synchronized_calling(self, output: List[str], sync_data: Dict):
+    def _format_synchronized_calling(self, buf: io.StringIO, sync_data: Dict):
         """Format synchronized calling analysis"""
-        output.append("\n🔄 SYNCHRONIZED CALLING PATTERNS")
-        output.append("-" * 30)
+        buf.write("\n🔄 SYNCHRONIZED CALLING PATTERNS\n")
+        buf.write("-" * 30 + "\n")
         
         if sync_data['sync_patterns']:
-            output.append(f"Found {len(sync_data['sync_patterns'])} synchronized calling events")
+            buf.write(f"Found {len(sync_data['sync_patterns'])} synchronized calling events\n")
             
             # Show top synchronized events
             for i, pattern in enumerate(sync_data['sync_patterns'][:5], 1):
                 emoji = "🚨" if pattern['suspect_count'] >= 3 else "⚠️"
-                output.append(f"\n{emoji} Event {i}: {pattern['timestamp']}")
-                output.append(f"   Active suspects: {', '.join(pattern['suspects'])}")
-                output.append(f"   Pattern: {pattern['pattern']}")
-                output.append(f"   Total calls: {pattern['call_count']} within 5-minute window")
+                buf.write(f"\n{emoji} Event {i}: {pattern['timestamp']}\n")
+                buf.write(f"   Active suspects: {', '.join(pattern['suspects'])}\n")
+                buf.write(f"   Pattern: {pattern['pattern']}\n")
+                buf.write(f"   Total calls: {pattern['call_count']} within 5-minute window\n")
             
             # High-risk patterns
             high_risk = [p for p in sync_data['sync_patterns'] if p['suspect_count'] >= 3]
             if high_risk:
-                output.append("\n🚨 COORDINATED OPERATIONS DETECTED:")
-                output.append(f"   {len(high_risk)} instances of 3+ suspects active simultaneously")
-                output.append("   This strongly suggests coordinated criminal activity")
+                buf.write("\n🚨 COORDINATED OPERATIONS DETECTED:\n")
+                buf.write(f"   {len(high_risk)} instances of 3+ suspects active simultaneously\n")
+                buf.write("   This strongly suggests coordinated criminal activity\n")
         else:
-            output.append("  ✓ No synchronized calling patterns detected")
+            buf.write("  ✓ No synchronized calling patterns detected\n")
         
         if sync_data['coordination_windows']:
-            output.append("\n⚠️ SUSTAINED COORDINATION WINDOWS:")
+            buf.write("\n⚠️ SUSTAINED COORDINATION WINDOWS:\n")
             for window in sync_data['coordination_windows'][:3]:
-                output.append(f"   • {window['start']} to {window['end']}")
-                output.append(f"     Pattern: {window['pattern']}")
-        
-        return output
\ No newline at end of file
+                buf.write(f"   • {window['start']} to {window['end']}\n")
+                buf.write(f"     Pattern: {window['pattern']}\n")
\ No newline at end of file
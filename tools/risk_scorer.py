@@ -3,10 +3,18 @@ Risk Scoring Tool for CDR Intelligence
 Calculates comprehensive risk scores for suspects based on multiple factors
 """
 
-from typing import Dict, Optional, Any, List, Type
+import io
+import re
+from typing import Dict, Optional, Any, List, Tuple, Type
+from dataclasses import dataclass, field
+from collections import OrderedDict, deque
+from itertools import islice
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from langchain.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import pandas as pd
+import numpy as np
 from loguru import logger
 
 import sys
@@ -16,6 +24,189 @@ sys.path.append(str(Path(__file__).parent.parent))
 from config import settings
 from processors.pattern_detector import PatternDetector
 
+_COMPONENT_KEYS = (
+    'device_risk', 'temporal_risk', 'communication_risk', 'frequency_risk',
+    'location_risk', 'behavioral_risk', 'network_risk'
+)
+
+# PatternView attributes stacked into the cohort scoring frame
+_FEATURE_COLUMNS = [
+    'imei_count', 'sim_swap', 'odd_hour_pct', 'burst_count', 'voice_only',
+    'voice_pct', 'repeated_durations', 'high_freq', 'tower_hopping',
+    'rapid_moves', 'suspicious_count', 'direct_connections', 'common_contacts'
+]
+
+# Queries asking for the whole cohort rather than one suspect
+_ALL_RE = re.compile(r'\ball\b|\brank\b|\bevery\b', re.I)
+
+# Pattern detection results kept per suspect between agent calls
+_PATTERN_CACHE_SIZE = 256
+
+def _frame_fingerprint(df: pd.DataFrame) -> Tuple[int, Any]:
+    """Cheap change check for a cached frame: its length and last call time"""
+    last = df['datetime'].iat[-1] if len(df) and 'datetime' in df.columns else None
+    return len(df), None if pd.isna(last) else last
+
+# Lower score bounds of MEDIUM, HIGH and CRITICAL; index 0 is LOW
+_RISK_BINS = np.array([30, 50, 70])
+_RISK_LEVELS = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+_RISK_EMOJIS = ('🟢', '🟡', '🔴', '🔴')
+
+# Score tables: a value strictly above bins[k] earns points[k + 1]
+_IMEI_BINS, _IMEI_PTS = np.array([1]), np.array([0, 25])
+_ODD_HOUR_BINS, _ODD_HOUR_PTS = np.array([1.0, 2.0, 4.0]), np.array([0, 10, 15, 20])
+_BURST_BINS, _BURST_PTS = np.array([3]), np.array([0, 5])
+_VOICE_PCT_BINS, _VOICE_PCT_PTS = np.array([90.0]), np.array([0, 15])
+_HIGH_FREQ_BINS, _HIGH_FREQ_PTS = np.array([0, 3]), np.array([0, 10, 15])
+_RAPID_MOVES_BINS, _RAPID_MOVES_PTS = np.array([2]), np.array([0, 8])
+_COMMON_CONTACTS_BINS, _COMMON_CONTACTS_PTS = np.array([2]), np.array([0, 5])
+
+# Report line templates, each written straight to the report buffer
+_RANKING_ROW = "{rank:<5} {suspect:<25} {risk:<10} {score:<7} {indicator}\n"
+_DETAIL_HEADER = "\n{risk_emoji} {suspect}\n   Total Risk Score: {total_risk_score}/100 ({risk_level})\n   " + "─" * 50 + "\n"
+_COMPONENT_LINE = "   {icon} {label}: {points}/{max_points} points\n"
+
+@dataclass(slots=True)
+class PatternView:
+    """Flat view of the PatternDetector fields used for risk scoring and reporting"""
+    imei_count: int = 0
+    sim_swap: bool = False
+    odd_hour_pct: float = 0
+    burst_count: int = 0
+    voice_only: bool = False
+    voice_pct: float = 0
+    repeated_durations: bool = False
+    circular_loops: bool = False
+    one_ring: bool = False
+    high_freq: int = 0
+    tower_hopping: bool = False
+    rapid_moves: int = 0
+    suspicious: List[str] = field(default_factory=list)
+    direct_connections: bool = False
+    common_contacts: int = 0
+    
+    @property
+    def suspicious_count(self) -> int:
+        return len(self.suspicious)
+    
+    @classmethod
+    def from_dict(cls, patterns: Dict[str, Any]) -> 'PatternView':
+        """Walk the nested pattern dict once"""
+        device_data = patterns.get('device_patterns', {})
+        temporal_data = patterns.get('temporal_patterns', {})
+        comm_data = patterns.get('communication_patterns', {})
+        freq_data = patterns.get('frequency_patterns', {})
+        location_data = patterns.get('location_patterns', {})
+        behavioral_data = patterns.get('behavioral_indicators', {})
+        network_patterns = patterns.get('network_patterns', {})
+        
+        return cls(
+            imei_count=device_data.get('imei_count', 0),
+            sim_swap=bool(device_data.get('sim_swapping_detected')),
+            odd_hour_pct=temporal_data.get('odd_hour_percentage', 0),
+            burst_count=len(temporal_data.get('call_bursts', [])),
+            voice_only=bool(comm_data.get('voice_only_behavior')),
+            voice_pct=comm_data.get('voice_percentage', 0),
+            repeated_durations=bool(comm_data.get('repeated_durations')),
+            circular_loops=bool(comm_data.get('circular_loops')),
+            one_ring=bool(comm_data.get('one_ring_patterns', {}).get('signaling_detected')),
+            high_freq=len(freq_data.get('high_frequency_contacts', [])),
+            tower_hopping=bool(location_data.get('tower_hopping_detected')),
+            rapid_moves=len(location_data.get('rapid_movements', [])),
+            suspicious=behavioral_data.get('suspicious_patterns', []),
+            direct_connections=bool(network_patterns.get('direct_connections')),
+            common_contacts=network_patterns.get('common_contacts', 0)
+        )
+
+def _points(bins: np.ndarray, points: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Look up score table points for each value"""
+    return points[np.searchsorted(bins, values, side='left')]
+
+def _score_features(features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Score a float feature matrix laid out as _FEATURE_COLUMNS, one row per suspect
+    
+    Returns the component scores (ordered as _COMPONENT_KEYS), the total score,
+    the index into _RISK_LEVELS and whether the 2+ IMEI override raised the level.
+    """
+    (imei, sim_swap, odd_hour_pct, burst_count, voice_only, voice_pct, repeated_durations,
+     high_freq, tower_hopping, rapid_moves, suspicious_count, direct_connections,
+     common_contacts) = features.T
+    
+    # 1. Device Risk (0-25 points)
+    device_risk = _points(_IMEI_BINS, _IMEI_PTS, imei)
+    device_risk = np.where(device_risk > 0, device_risk, np.where(sim_swap > 0, 10, 0))
+    
+    # 2. Temporal Risk (0-25 points), including burst pattern risk
+    temporal_risk = _points(_ODD_HOUR_BINS, _ODD_HOUR_PTS, odd_hour_pct) + _points(_BURST_BINS, _BURST_PTS, burst_count)
+    
+    # 3. Communication Risk (0-25 points)
+    communication_risk = np.where(voice_only > 0, 20, _points(_VOICE_PCT_BINS, _VOICE_PCT_PTS, voice_pct))
+    communication_risk = communication_risk + np.where(repeated_durations > 0, 5, 0)
+    
+    # 4. Frequency Risk (0-15 points)
+    frequency_risk = _points(_HIGH_FREQ_BINS, _HIGH_FREQ_PTS, high_freq)
+    
+    # 5. Location Risk (0-10 points)
+    location_risk = np.where(tower_hopping > 0, 10, _points(_RAPID_MOVES_BINS, _RAPID_MOVES_PTS, rapid_moves))
+    
+    # 6. Behavioral Risk (0-10 points)
+    behavioral_risk = np.where(suspicious_count > 0, 10, 0)
+    
+    # 7. Network Risk (0-10 points)
+    network_risk = np.where(
+        direct_connections > 0, 10, _points(_COMMON_CONTACTS_BINS, _COMMON_CONTACTS_PTS, common_contacts)
+    )
+    
+    components = np.column_stack([
+        device_risk, temporal_risk, communication_risk, frequency_risk,
+        location_risk, behavioral_risk, network_risk
+    ]).astype(np.int64)
+    
+    # Calculate total risk score and determine risk level
+    total = components.sum(axis=1)
+    risk_index = np.searchsorted(_RISK_BINS, total, side='right')
+    
+    # Override: Anyone with 2+ IMEIs should be at least MEDIUM risk
+    elevated = (imei >= 2) & (risk_index == 0)
+    risk_index = np.where(elevated, 1, risk_index)
+    
+    return components, total, risk_index, elevated
+
+# Detailed breakdown per component: (component key, icon, label, max points, rule groups).
+# Each rule is (predicate on PatternView, line template); within a group the first match wins.
+_DETAIL_RULES = (
+    ('device_risk', "📱", "Device Risk", 25, (
+        ((lambda v: v.imei_count >= 3, "      • {v.imei_count} IMEIs detected: +25 points (HIGH RISK)\n"),
+         (lambda v: v.imei_count == 2, "      • 2 IMEIs detected: +25 points (device switching)\n")),
+        ((lambda v: v.sim_swap, "      • SIM swapping detected: +10 points\n"),),
+    )),
+    ('temporal_risk', "⏰", "Temporal Risk", 25, (
+        ((lambda v: v.odd_hour_pct > 4, "      • {v.odd_hour_pct:.1f}% odd hour calls: +20 points (VERY HIGH)\n"),
+         (lambda v: v.odd_hour_pct > 2, "      • {v.odd_hour_pct:.1f}% odd hour calls: +15 points\n"),
+         (lambda v: v.odd_hour_pct > 1, "      • Elevated odd hour activity: +10 points\n")),
+        ((lambda v: v.burst_count > 3, "      • {v.burst_count} call bursts: +5 points\n"),),
+    )),
+    ('communication_risk', "📞", "Communication Risk", 25, (
+        ((lambda v: v.voice_only, "      • 100% voice calls (no SMS): +20 points (avoiding traces)\n"),
+         (lambda v: v.voice_pct > 90, "      • {v.voice_pct}% voice calls: +15 points\n")),
+        ((lambda v: v.repeated_durations, "      • Repeated call durations: +5 points (coded communication)\n"),),
+        ((lambda v: v.circular_loops, "      • Circular communication loops: +5 points\n"),),
+        ((lambda v: v.one_ring, "      • One-ring signaling detected: +5 points\n"),),
+    )),
+    ('frequency_risk', "📊", "Frequency Risk", 15, (
+        ((lambda v: v.high_freq > 3, "      • {v.high_freq} high frequency contacts: +15 points\n"),
+         (lambda v: v.high_freq > 0, "      • {v.high_freq} high frequency contacts: +10 points\n")),
+    )),
+    ('network_risk', "🌐", "Network Risk", 10, (
+        ((lambda v: v.direct_connections, "      • Direct suspect connections: +10 points\n"),),
+        ((lambda v: v.common_contacts >= 3, "      • {v.common_contacts} common contacts: +5 points\n"),),
+    )),
+)
+
+def _detect_patterns_worker(df: pd.DataFrame, suspect: str) -> Dict[str, Any]:
+    """Process pool entry point: run pattern detection with a detector local to the worker"""
+    return PatternDetector().detect_all_patterns(df, suspect)
+
 class RiskScoringInput(BaseModel):
     """Input for risk scoring tool"""
     query: str = Field(description="Risk assessment request (e.g., 'calculate risk scores', 'rank all suspects')")
@@ -30,13 +221,17 @@ class RiskScoringTool(BaseTool):
     Use this to prioritize investigations.
     Examples: 'calculate risk scores for all suspects', 'rank suspects by risk level'"""
     
+    model_config = ConfigDict(arbitrary_types_allowed=True, validate_assignment=False)
+    
     args_schema: Type[BaseModel] = RiskScoringInput
-    cdr_data: Dict[str, pd.DataFrame] = {}
+    cdr_data: Dict[str, pd.DataFrame] = Field(default_factory=dict, exclude=True)
     pattern_detector: Optional[Any] = None
+    pattern_cache: Optional[Any] = None
     
     def __init__(self):
         super().__init__()
         self.pattern_detector = PatternDetector()
+        self.pattern_cache = OrderedDict()
     
     def _run(self, query: str, suspect_name: Optional[str] = None) -> str:
         """Run risk scoring analysis"""
@@ -44,25 +239,32 @@ class RiskScoringTool(BaseTool):
             if not self.cdr_data:
                 return "No CDR data loaded. Please load data first."
             
-            analyze_all = "all" in query.lower() or not suspect_name
-            results = []
-            suspects_to_analyze = self.cdr_data.keys() if analyze_all else [suspect_name]
+            analyze_all = bool(_ALL_RE.search(query)) or not suspect_name
+            if analyze_all:
+                suspect_data = list(self.cdr_data.items())
+            else:
+                df = self.cdr_data.get(suspect_name)
+                if df is None:
+                    return "No suspects found for risk assessment."
+                suspect_data = [(suspect_name, df)]
+            
+            # Opt-in: suspects below the row floor skip pattern detection and
+            # are reported unscored. IMEI and odd-hour scores have no sample
+            # floor, so any floor above 0 can change the ranking
+            min_rows = settings.min_rows_for_scoring
+            scorable = [(suspect, df) for suspect, df in suspect_data if len(df) >= min_rows]
             
-            for suspect in suspects_to_analyze:
-                if suspect in self.cdr_data:
-                    # Run comprehensive pattern detection
-                    patterns = self.pattern_detector.detect_all_patterns(
-                        self.cdr_data[suspect], 
-                        suspect
-                    )
-                    
-                    # Calculate enhanced risk score
-                    risk_assessment = self._calculate_comprehensive_risk(patterns)
-                    risk_assessment['suspect'] = suspect
-                    results.append(risk_assessment)
+            # Run comprehensive pattern detection
+            patterns_list = self._detect_patterns(scorable)
             
-            if not results:
-                return "No suspects found for risk assessment."
+            # Calculate enhanced risk scores for the whole cohort at once
+            results = self._assess_cohort(patterns_list)
+            for (suspect, _), risk_assessment in zip(scorable, results):
+                risk_assessment['suspect'] = suspect
+            results.extend(
+                self._insufficient_data_assessment(suspect, df)
+                for suspect, df in suspect_data if len(df) < min_rows
+            )
             
             # Sort by risk score
             results.sort(key=lambda x: x['total_risk_score'], reverse=True)
@@ -78,300 +280,262 @@ class RiskScoringTool(BaseTool):
         """Async not implemented"""
         raise NotImplementedError("Async execution not supported")
     
-    def _calculate_comprehensive_risk(self, patterns: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate comprehensive risk score with detailed breakdown"""
-        risk_components = {
-            'device_risk': 0,
-            'temporal_risk': 0,
-            'communication_risk': 0,
-            'frequency_risk': 0,
-            'location_risk': 0,
-            'behavioral_risk': 0,
-            'network_risk': 0
-        }
+    def _detect_patterns(self, suspect_data: List[Tuple[str, pd.DataFrame]]) -> List[Dict[str, Any]]:
+        """Detect patterns for each suspect, skipping cached ones and fanning out the rest"""
+        patterns_list = [self._cached_patterns(suspect, df) for suspect, df in suspect_data]
+        missing = [i for i, patterns in enumerate(patterns_list) if patterns is None]
+        
+        if settings.risk_scoring_workers > 1 and len(missing) > 1:
+            # Detection is mostly pure-Python row loops, so separate processes sidestep the GIL
+            with ProcessPoolExecutor(max_workers=min(settings.risk_scoring_workers, len(missing))) as pool:
+                futures = {
+                    i: pool.submit(_detect_patterns_worker, suspect_data[i][1], suspect_data[i][0])
+                    for i in missing
+                }
+                detected = {i: future.result() for i, future in futures.items()}
+        elif settings.risk_scoring_parallel and len(missing) > 1:
+            # Suspects are independent and PatternDetector only reads its config
+            with ThreadPoolExecutor(max_workers=min(8, len(missing))) as pool:
+                futures = {
+                    i: pool.submit(self.pattern_detector.detect_all_patterns, suspect_data[i][1], suspect_data[i][0])
+                    for i in missing
+                }
+                detected = {i: future.result() for i, future in futures.items()}
+        else:
+            detected = {
+                i: self.pattern_detector.detect_all_patterns(suspect_data[i][1], suspect_data[i][0])
+                for i in missing
+            }
         
-        risk_factors = []
+        for i, patterns in detected.items():
+            self._cache_patterns(*suspect_data[i], patterns)
+            patterns_list[i] = patterns
         
-        # 1. Device Risk (0-25 points)
-        device_data = patterns.get('device_patterns', {})
-        imei_count = device_data.get('imei_count', 0)
+        return patterns_list
+    
+    def _cached_patterns(self, suspect: str, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Return the cached patterns for a suspect while their data is unchanged"""
+        cached = self.pattern_cache.get(suspect)
+        # A live weak reference is never to a reused id, and the fingerprint
+        # catches in-place edits that change the length or the last call
+        if cached is not None and cached[0]() is df and cached[1] == _frame_fingerprint(df):
+            self.pattern_cache.move_to_end(suspect)
+            return cached[2]
+        return None
+    
+    def _cache_patterns(self, suspect: str, df: pd.DataFrame, patterns: Dict[str, Any]):
+        """Remember a suspect's patterns, evicting the least recently used entry
+        
+        The frame is held weakly, so replaced CDR data is not kept alive by the cache.
+        """
+        self.pattern_cache[suspect] = (weakref.ref(df), _frame_fingerprint(df), patterns)
+        if len(self.pattern_cache) > _PATTERN_CACHE_SIZE:
+            self.pattern_cache.popitem(last=False)
+    
+    def _assess_cohort(self, patterns_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score all suspects in one pass and attach per-suspect risk factors"""
+        views = [PatternView.from_dict(patterns) for patterns in patterns_list]
+        features = np.array(
+            [[getattr(view, column) for column in _FEATURE_COLUMNS] for view in views], dtype=np.float64
+        ).reshape(-1, len(_FEATURE_COLUMNS))
+        components, total, risk_index, elevated = _score_features(features)
+        
+        assessments = []
+        for patterns, view, row, score, level, is_elevated in zip(
+            patterns_list, views, components.tolist(), total.tolist(), risk_index.tolist(), elevated.tolist()
+        ):
+            risk_components = dict(zip(_COMPONENT_KEYS, row))
+            risk_factors = self._build_risk_factors(view)
+            
+            # Override: Anyone with 2+ IMEIs should be at least MEDIUM risk
+            if is_elevated:
+                risk_factors.appendleft("Elevated to MEDIUM due to device switching")
+            risk_factors = list(risk_factors)
+            
+            assessments.append({
+                'total_risk_score': score,
+                'imei_count': view.imei_count,
+                'risk_level': _RISK_LEVELS[level],
+                'risk_emoji': _RISK_EMOJIS[level],
+                'risk_components': risk_components,
+                'risk_factors': risk_factors,
+                'primary_indicators': risk_factors[:3] if risk_factors else [],
+                'patterns': patterns,  # Include full pattern data
+                'pattern_view': view
+            })
+        
+        return assessments
+    
+    def _insufficient_data_assessment(self, suspect: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Assessment for a suspect with too few records to score"""
+        risk_factors = ['Insufficient data']
+        # The IMEI count still feeds the cohort's organized-crime check
+        imei_col = settings.cdr_columns['imei']
+        imei_count = df[imei_col].dropna().nunique() if imei_col in df.columns else 0
+        return {
+            'suspect': suspect,
+            'total_risk_score': 0,
+            'imei_count': imei_count,
+            'risk_level': _RISK_LEVELS[0],
+            'risk_emoji': _RISK_EMOJIS[0],
+            'risk_components': {key: 0 for key in _COMPONENT_KEYS},
+            'risk_factors': risk_factors,
+            'primary_indicators': [],
+            'patterns': {},
+            'pattern_view': PatternView()
+        }
+    
+    def _build_risk_factors(self, view: PatternView) -> deque:
+        """Describe the risk factors that contributed to a suspect's score"""
+        risk_factors = deque()
         
-        if imei_count >= 3:
-            risk_components['device_risk'] = 25
-            risk_factors.append(f"{imei_count} IMEIs detected - HIGH RISK")
-        elif imei_count == 2:
-            risk_components['device_risk'] = 25
+        if view.imei_count >= 3:
+            risk_factors.append(f"{view.imei_count} IMEIs detected - HIGH RISK")
+        elif view.imei_count == 2:
             risk_factors.append(f"2 IMEIs detected - device switching (MEDIUM RISK)")
-        elif device_data.get('sim_swapping_detected'):
-            risk_components['device_risk'] = 10
+        elif view.sim_swap:
             risk_factors.append("SIM swapping detected")
         
-        # 2. Temporal Risk (0-20 points)
-        temporal_data = patterns.get('temporal_patterns', {})
-        odd_hour_pct = temporal_data.get('odd_hour_percentage', 0)
-        
-        if odd_hour_pct > 4:
-            risk_components['temporal_risk'] = 20
-            risk_factors.append(f"{odd_hour_pct:.1f}% odd hour activity - VERY HIGH")
-        elif odd_hour_pct > 2:
-            risk_components['temporal_risk'] = 15
-            risk_factors.append(f"{odd_hour_pct:.1f}% odd hour activity")
-        elif odd_hour_pct > 1:
-            risk_components['temporal_risk'] = 10
+        if view.odd_hour_pct > 4:
+            risk_factors.append(f"{view.odd_hour_pct:.1f}% odd hour activity - VERY HIGH")
+        elif view.odd_hour_pct > 2:
+            risk_factors.append(f"{view.odd_hour_pct:.1f}% odd hour activity")
+        elif view.odd_hour_pct > 1:
             risk_factors.append("Elevated odd hour activity")
         
-        # Add burst pattern risk
-        burst_count = len(temporal_data.get('call_bursts', []))
-        if burst_count > 3:
-            risk_components['temporal_risk'] += 5
-            risk_factors.append(f"{burst_count} call bursts detected")
+        if view.burst_count > 3:
+            risk_factors.append(f"{view.burst_count} call bursts detected")
         
-        # 3. Communication Risk (0-20 points)
-        comm_data = patterns.get('communication_patterns', {})
-        
-        if comm_data.get('voice_only_behavior'):
-            risk_components['communication_risk'] = 20
+        if view.voice_only:
             risk_factors.append("100% voice communication - NO SMS")
-        elif comm_data.get('voice_percentage', 0) > 90:
-            risk_components['communication_risk'] = 15
-            risk_factors.append(f"{comm_data['voice_percentage']}% voice-heavy communication")
+        elif view.voice_pct > 90:
+            risk_factors.append(f"{view.voice_pct}% voice-heavy communication")
         
-        if comm_data.get('repeated_durations'):
-            risk_components['communication_risk'] += 5
+        if view.repeated_durations:
             risk_factors.append("Repeated call durations (coded communication)")
         
-        # 4. Frequency Risk (0-15 points)
-        freq_data = patterns.get('frequency_patterns', {})
-        high_freq_contacts = len(freq_data.get('high_frequency_contacts', []))
-        
-        if high_freq_contacts > 3:
-            risk_components['frequency_risk'] = 15
-            risk_factors.append(f"{high_freq_contacts} very high frequency contacts")
-        elif high_freq_contacts > 0:
-            risk_components['frequency_risk'] = 10
+        if view.high_freq > 3:
+            risk_factors.append(f"{view.high_freq} very high frequency contacts")
+        elif view.high_freq > 0:
             risk_factors.append("High frequency contact patterns")
         
-        # 5. Location Risk (0-10 points)
-        location_data = patterns.get('location_patterns', {})
-        
-        if location_data.get('tower_hopping_detected'):
-            risk_components['location_risk'] = 10
+        if view.tower_hopping:
             risk_factors.append("Tower hopping detected (rapid movement)")
-        elif len(location_data.get('rapid_movements', [])) > 2:
-            risk_components['location_risk'] = 8
+        elif view.rapid_moves > 2:
             risk_factors.append("Multiple rapid tower changes")
         
-        # 6. Behavioral Risk (0-10 points)
-        behavioral_data = patterns.get('behavioral_indicators', {})
-        suspicious_patterns = behavioral_data.get('suspicious_patterns', [])
-        
-        if suspicious_patterns:
-            risk_components['behavioral_risk'] = 10
-            risk_factors.extend(suspicious_patterns)
+        risk_factors.extend(view.suspicious)
         
-        # 7. Network Risk (0-10 points)
-        network_patterns = patterns.get('network_patterns', {})
-        if network_patterns.get('direct_connections'):
-            risk_components['network_risk'] = 10
+        if view.direct_connections:
             risk_factors.append("Direct connections to other suspects")
-        elif network_patterns.get('common_contacts', 0) >= 3:
-            risk_components['network_risk'] = 5
-            risk_factors.append(f"{network_patterns.get('common_contacts', 0)} common contacts with suspects")
-        
-        # Calculate total risk score
-        total_risk = sum(risk_components.values())
-        
-        # Determine risk level
-        if total_risk >= 70:
-            risk_level = "CRITICAL"
-            risk_emoji = "🔴"
-        elif total_risk >= 50:
-            risk_level = "HIGH"
-            risk_emoji = "🔴"
-        elif total_risk >= 30:
-            risk_level = "MEDIUM"
-            risk_emoji = "🟡"
-        else:
-            risk_level = "LOW"
-            risk_emoji = "🟢"
+        elif view.common_contacts >= 3:
+            risk_factors.append(f"{view.common_contacts} common contacts with suspects")
         
-        # Override: Anyone with 2+ IMEIs should be at least MEDIUM risk
-        device_data = patterns.get('device_patterns', {})
-        imei_count = device_data.get('imei_count', 0)
-        if imei_count >= 2 and risk_level == "LOW":
-            risk_level = "MEDIUM"
-            risk_emoji = "🟡"
-            risk_factors.insert(0, "Elevated to MEDIUM due to device switching")
-        
-        return {
-            'total_risk_score': total_risk,
-            'risk_level': risk_level,
-            'risk_emoji': risk_emoji,
-            'risk_components': risk_components,
-            'risk_factors': risk_factors,
-            'primary_indicators': risk_factors[:3] if risk_factors else [],
-            'patterns': patterns  # Include full pattern data
-        }
+        return risk_factors
     
     def _format_risk_assessment(self, results: List[Dict], query: str) -> str:
         """Format risk assessment results"""
-        output = []
+        buf = io.StringIO()
         
-        output.append("🚨 CRIMINAL RISK ASSESSMENT REPORT")
-        output.append("=" * 60)
-        output.append(f"Analyzed {len(results)} suspects")
+        buf.write("🚨 CRIMINAL RISK ASSESSMENT REPORT\n")
+        buf.write("=" * 60 + "\n")
+        buf.write(f"Analyzed {len(results)} suspects\n")
         
-        # Group by risk level
-        critical = [r for r in results if r['risk_level'] == 'CRITICAL']
-        high = [r for r in results if r['risk_level'] == 'HIGH']
-        medium = [r for r in results if r['risk_level'] == 'MEDIUM']
-        low = [r for r in results if r['risk_level'] == 'LOW']
+        # Group by risk level in a single pass; row labels are positions in results
+        results_df = pd.DataFrame(
+            results, columns=['suspect', 'risk_emoji', 'risk_level', 'total_risk_score', 'primary_indicators']
+        )
+        level_counts = results_df.groupby('risk_level', sort=False).size().to_dict()
         
         # Summary
-        output.append(f"\n📊 RISK DISTRIBUTION:")
-        if critical:
-            output.append(f"   🔴 CRITICAL RISK: {len(critical)} suspects")
-        if high:
-            output.append(f"   🔴 HIGH RISK: {len(high)} suspects")
-        if medium:
-            output.append(f"   🟡 MEDIUM RISK: {len(medium)} suspects")
-        if low:
-            output.append(f"   🟢 LOW RISK: {len(low)} suspects")
+        buf.write(f"\n📊 RISK DISTRIBUTION:\n")
+        for level, emoji in zip(reversed(_RISK_LEVELS), reversed(_RISK_EMOJIS)):
+            if level_counts.get(level):
+                buf.write(f"   {emoji} {level} RISK: {level_counts[level]} suspects\n")
         
         # Detailed rankings
-        output.append(f"\n📋 SUSPECT RISK RANKING")
-        output.append("-" * 60)
+        buf.write(f"\n📋 SUSPECT RISK RANKING\n")
+        buf.write("-" * 60 + "\n")
         
         # Create table-like output
-        output.append(f"{'Rank':<5} {'Suspect':<25} {'Risk':<10} {'Score':<7} {'Primary Indicators'}")
-        output.append("-" * 80)
-        
-        for i, result in enumerate(results[:10], 1):  # Top 10
-            suspect_name = result['suspect'][:24]  # Truncate if needed
-            risk_display = f"{result['risk_emoji']} {result['risk_level']}"
-            score_display = f"{result['total_risk_score']}/100"
-            
-            # Primary indicators
-            indicators = result['primary_indicators']
-            if indicators:
-                indicator_str = indicators[0][:40]  # First indicator, truncated
-            else:
-                indicator_str = "No significant risks"
-            
-            output.append(f"{i:<5} {suspect_name:<25} {risk_display:<10} {score_display:<7} {indicator_str}")
+        buf.write(f"{'Rank':<5} {'Suspect':<25} {'Risk':<10} {'Score':<7} {'Primary Indicators'}\n")
+        buf.write("-" * 80 + "\n")
+        
+        # Columnar view of the top 10 so each display field is built in one vectorized step
+        top_df = results_df.head(10)
+        ranking = pd.DataFrame({
+            'rank': range(1, len(top_df) + 1),
+            'suspect': top_df['suspect'].str.slice(0, 24),  # Truncate if needed
+            'risk': top_df['risk_emoji'] + " " + top_df['risk_level'],
+            'score': top_df['total_risk_score'].astype(str) + "/100",
+            # First primary indicator, truncated
+            'indicator': top_df['primary_indicators'].str[0].fillna("No significant risks").str.slice(0, 40)
+        })
+        buf.writelines(_RANKING_ROW.format(**row._asdict()) for row in ranking.itertuples(index=False))
         
         # Detailed breakdown for top suspects
-        output.append(f"\n🎯 DETAILED RISK SCORING BREAKDOWN")
-        output.append("-" * 60)
+        buf.write(f"\n🎯 DETAILED RISK SCORING BREAKDOWN\n")
+        buf.write("-" * 60 + "\n")
         
-        # Show top suspects AND medium risk with details
-        detailed_suspects = sorted(results, key=lambda x: x['total_risk_score'], reverse=True)
-        detailed_suspects = [r for r in detailed_suspects if r['total_risk_score'] >= 30 or r['risk_level'] != 'LOW'][:5]
+        # Show top suspects AND medium risk with details; results are already sorted by score
+        detailed_suspects = islice(
+            (r for r in results if r['total_risk_score'] >= 30 or r['risk_level'] != 'LOW'), 5
+        )
         
         for result in detailed_suspects:
-            output.append(f"\n{result['risk_emoji']} {result['suspect']}")
-            output.append(f"   Total Risk Score: {result['total_risk_score']}/100 ({result['risk_level']})")
-            output.append("   " + "─" * 50)
+            buf.write(_DETAIL_HEADER.format_map(result))
             
             # Detailed point breakdown
             components = result['risk_components']
-            patterns = result.get('patterns', {})
-            
-            # Device Risk Breakdown
-            output.append(f"   📱 Device Risk: {components['device_risk']}/25 points")
-            if components['device_risk'] > 0:
-                device_patterns = patterns.get('device_patterns', {})
-                imei_count = device_patterns.get('imei_count', 1)
-                if imei_count >= 3:
-                    output.append(f"      • {imei_count} IMEIs detected: +25 points (HIGH RISK)")
-                elif imei_count == 2:
-                    output.append(f"      • 2 IMEIs detected: +25 points (device switching)")
-                if device_patterns.get('sim_swapping_detected'):
-                    output.append(f"      • SIM swapping detected: +10 points")
-            
-            # Temporal Risk Breakdown  
-            output.append(f"   ⏰ Temporal Risk: {components['temporal_risk']}/25 points")
-            if components['temporal_risk'] > 0:
-                temporal_patterns = patterns.get('temporal_patterns', {})
-                odd_hour_pct = temporal_patterns.get('odd_hour_percentage', 0)
-                if odd_hour_pct > 4:
-                    output.append(f"      • {odd_hour_pct:.1f}% odd hour calls: +20 points (VERY HIGH)")
-                elif odd_hour_pct > 2:
-                    output.append(f"      • {odd_hour_pct:.1f}% odd hour calls: +15 points")
-                elif odd_hour_pct > 1:
-                    output.append(f"      • Elevated odd hour activity: +10 points")
-                burst_count = len(temporal_patterns.get('call_bursts', []))
-                if burst_count > 3:
-                    output.append(f"      • {burst_count} call bursts: +5 points")
-            
-            # Communication Risk Breakdown
-            output.append(f"   📞 Communication Risk: {components['communication_risk']}/25 points")
-            if components['communication_risk'] > 0:
-                comm_patterns = patterns.get('communication_patterns', {})
-                if comm_patterns.get('voice_only_behavior'):
-                    output.append(f"      • 100% voice calls (no SMS): +20 points (avoiding traces)")
-                elif comm_patterns.get('voice_percentage', 0) > 90:
-                    output.append(f"      • {comm_patterns['voice_percentage']}% voice calls: +15 points")
-                if comm_patterns.get('repeated_durations'):
-                    output.append(f"      • Repeated call durations: +5 points (coded communication)")
-                if comm_patterns.get('circular_loops'):
-                    output.append(f"      • Circular communication loops: +5 points")
-                if comm_patterns.get('one_ring_patterns', {}).get('signaling_detected'):
-                    output.append(f"      • One-ring signaling detected: +5 points")
-            
-            # Frequency Risk Breakdown
-            output.append(f"   📊 Frequency Risk: {components['frequency_risk']}/15 points")
-            if components['frequency_risk'] > 0:
-                freq_patterns = patterns.get('frequency_patterns', {})
-                high_freq = len(freq_patterns.get('high_frequency_contacts', []))
-                if high_freq > 3:
-                    output.append(f"      • {high_freq} high frequency contacts: +15 points")
-                elif high_freq > 0:
-                    output.append(f"      • {high_freq} high frequency contacts: +10 points")
+            view = result['pattern_view']
             
-            # Network Risk Breakdown
-            output.append(f"   🌐 Network Risk: {components['network_risk']}/10 points")
-            if components['network_risk'] > 0:
-                network_patterns = patterns.get('network_patterns', {})
-                if network_patterns.get('direct_connections'):
-                    output.append(f"      • Direct suspect connections: +10 points")
-                if network_patterns.get('common_contacts', 0) >= 3:
-                    output.append(f"      • {network_patterns.get('common_contacts', 0)} common contacts: +5 points")
+            for key, icon, label, max_points, rule_groups in _DETAIL_RULES:
+                buf.write(_COMPONENT_LINE.format(icon=icon, label=label, points=components[key], max_points=max_points))
+                if components[key] > 0:
+                    for rules in rule_groups:
+                        # Only the first matching rule of each group applies
+                        for predicate, template in rules:
+                            if predicate(view):
+                                buf.write(template.format(v=view))
+                                break
             
             # Override rules applied
             if "Elevated to MEDIUM due to device switching" in result.get('risk_factors', []):
-                output.append("   ⚠️ Override Applied: Elevated to MEDIUM due to 2+ IMEIs")
+                buf.write("   ⚠️ Override Applied: Elevated to MEDIUM due to 2+ IMEIs\n")
             
-            output.append("")  # Blank line between suspects
+            buf.write("\n")  # Blank line between suspects
         
         # Investigation priorities for high/critical risk
-        output.append(f"\n🎯 INVESTIGATION PRIORITIES")
-        output.append("-" * 60)
+        buf.write(f"\n🎯 INVESTIGATION PRIORITIES\n")
+        buf.write("-" * 60 + "\n")
         
-        high_priority = [r for r in results if r['total_risk_score'] >= 50]
-        if high_priority:
-            for result in high_priority[:3]:
-                output.append(f"\n{result['risk_emoji']} {result['suspect']} - IMMEDIATE ACTION REQUIRED")
-                for factor in result['risk_factors'][:3]:
-                    output.append(f"   • {factor}")
+        high_priority = results_df[results_df['total_risk_score'] >= 50].head(3)
+        if not high_priority.empty:
+            for result in (results[i] for i in high_priority.index):
+                buf.write(f"\n{result['risk_emoji']} {result['suspect']} - IMMEDIATE ACTION REQUIRED\n")
+                for factor in islice(result['risk_factors'], 3):
+                    buf.write(f"   • {factor}\n")
         
         # Recommendations
-        output.append(f"\n⚠️ RECOMMENDATIONS:")
+        buf.write(f"\n⚠️ RECOMMENDATIONS:\n")
         
-        if critical or high:
-            output.append("1. IMMEDIATE ACTION REQUIRED:")
-            for r in (critical + high)[:3]:
-                output.append(f"   • Deep investigation on {r['suspect']}")
+        # results arrive sorted by score, so CRITICAL rows already precede HIGH ones
+        urgent = results_df[results_df['risk_level'].isin(['CRITICAL', 'HIGH'])]
+        if not urgent.empty:
+            buf.write("1. IMMEDIATE ACTION REQUIRED:\n")
+            for r in (results[i] for i in urgent.index[:3]):
+                buf.write(f"   • Deep investigation on {r['suspect']}\n")
         
-        output.append("\n2. ADDITIONAL DATA NEEDED:")
-        output.append("   • IPDR data for encrypted app detection")
-        output.append("   • Bank records for financial correlation")
-        output.append("   • Tower dumps for meeting locations")
+        buf.write("\n2. ADDITIONAL DATA NEEDED:\n")
+        buf.write("   • IPDR data for encrypted app detection\n")
+        buf.write("   • Bank records for financial correlation\n")
+        buf.write("   • Tower dumps for meeting locations\n")
         
         # Pattern summary
-        if any(r['patterns'].get('device_patterns', {}).get('imei_count', 0) >= 3 for r in results):
-            output.append("\n3. ORGANIZED CRIME INDICATORS:")
-            output.append("   • Multiple device switching patterns detected")
-            output.append("   • Sophisticated operational security measures")
+        imei_counts = np.fromiter((r['imei_count'] for r in results), dtype=np.int16, count=len(results))
+        if (imei_counts >= 3).any():
+            buf.write("\n3. ORGANIZED CRIME INDICATORS:\n")
+            buf.write("   • Multiple device switching patterns detected\n")
+            buf.write("   • Sophisticated operational security measures\n")
         
-        return "\n".join(output)
\ No newline at end of file
+        return buf.getvalue()
\ No newline at end of file
@@ -3,12 +3,17 @@ Temporal Analysis Tool for CDR Intelligence
 Analyzes time-based patterns including odd hours, call bursts, and pattern days
 """
 
-from typing import Dict, Optional, Any, List, Type
+import io
+import re
+from typing import Dict, Optional, Any, List, Tuple, Type
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 import pandas as pd
-from datetime import datetime, timedelta
-from collections import defaultdict
+import numpy as np
+from datetime import datetime
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from loguru import logger
 
 import sys
@@ -17,6 +22,47 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from config import settings
 
+# Columns read by the temporal detectors
+_TEMPORAL_COLUMNS = ('datetime', 'hour', 'day_of_week', 'b_party_clean')
+_FEATURE_CACHE_SIZE = 256
+_FEATURE_CACHE_LOCK = threading.Lock()
+
+# Query keywords selecting each analysis (plain substrings, so plurals match)
+_ODD_HOURS_RE = re.compile(r'odd|midnight|night')
+_BURSTS_RE = re.compile(r'burst|rapid')
+_PATTERN_DAYS_RE = re.compile(r'pattern|tuesday|friday')
+
+# Suspects with fewer calls are left out of the detailed report unless "all" is requested
+_MIN_CALLS_FOR_DETAIL = 10
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_HOUR = 60 * _NS_PER_MINUTE
+
+def _scan_bursts(ts: np.ndarray, window_ns: int, threshold: int,
+                 limit: int) -> List[Tuple[int, int, int]]:
+    """Find up to `limit` call bursts in sorted int64 nanosecond timestamps.
+    
+    Returns (start, lo, hi) positions: `start` opens the window and
+    ts[lo:hi] are the calls inside it, including earlier calls sharing the
+    start time.
+    """
+    # Size every candidate window with two vectorised binary searches
+    lo = np.searchsorted(ts, ts, side='left')
+    hi = np.searchsorted(ts, ts + window_ns, side='right')
+    candidates = np.flatnonzero(hi - lo >= threshold)
+    
+    found = []
+    next_start = 0
+    for start in candidates.tolist():
+        if start < next_start:
+            continue
+        found.append((start, int(lo[start]), int(hi[start])))
+        if len(found) == limit:
+            break
+        # Skip past this burst
+        next_start = start + int(hi[start] - lo[start])
+    return found
+
 class TemporalAnalysisInput(BaseModel):
     """Input for temporal analysis tool"""
     query: str = Field(description="What temporal patterns to analyze (e.g., 'odd hours', 'call bursts', 'pattern days')")
@@ -32,7 +78,12 @@ class TemporalAnalysisTool(BaseTool):
     Examples: 'analyze odd hour activity', 'check for call bursts', 'pattern day analysis for all suspects'"""
     
     args_schema: Type[BaseModel] = TemporalAnalysisInput
-    cdr_data: Dict[str, pd.DataFrame] = {}
+    cdr_data: Dict[str, pd.DataFrame] = Field(default_factory=dict, exclude=True)
+    feature_cache: Optional[Any] = None
+    
+    def __init__(self):
+        super().__init__()
+        self.feature_cache = OrderedDict()
     
     def _run(self, query: str, suspect_name: Optional[str] = None) -> str:
         """Run temporal analysis"""
@@ -41,37 +92,49 @@ class TemporalAnalysisTool(BaseTool):
                 return "No CDR data loaded. Please load data first."
             
             # Determine analysis type
-            analyze_all = "all" in query.lower() or not suspect_name
             query_lower = query.lower()
+            analyze_all = "all" in query_lower or not suspect_name
             
             # Determine what to analyze
-            analyze_odd_hours = "odd" in query_lower or "midnight" in query_lower or "night" in query_lower
-            analyze_bursts = "burst" in query_lower or "rapid" in query_lower
-            analyze_patterns = "pattern" in query_lower or "tuesday" in query_lower or "friday" in query_lower
+            analyze_odd_hours = bool(_ODD_HOURS_RE.search(query_lower))
+            analyze_bursts = bool(_BURSTS_RE.search(query_lower))
+            analyze_patterns = bool(_PATTERN_DAYS_RE.search(query_lower))
             
             # Default to comprehensive analysis if not specific
             if not any([analyze_odd_hours, analyze_bursts, analyze_patterns]):
                 analyze_odd_hours = analyze_bursts = analyze_patterns = True
             
-            results = []
             suspects_to_analyze = self.cdr_data.keys() if analyze_all else [suspect_name]
+            suspects_to_analyze = [s for s in suspects_to_analyze if s in self.cdr_data]
+            
+            # Low-activity suspects only feed the risk summary unless "all" is requested
+            skip_small = "all" not in query_lower
+            
+            def analyze(suspect: str) -> Dict[str, Any]:
+                return self._analyze_suspect_temporal(
+                    suspect, 
+                    self.cdr_data[suspect],
+                    analyze_odd_hours,
+                    analyze_bursts,
+                    analyze_patterns,
+                    skip_small
+                )
             
-            for suspect in suspects_to_analyze:
-                if suspect in self.cdr_data:
-                    analysis = self._analyze_suspect_temporal(
-                        suspect, 
-                        self.cdr_data[suspect],
-                        analyze_odd_hours,
-                        analyze_bursts,
-                        analyze_patterns
-                    )
-                    results.append(analysis)
+            if settings.temporal_analysis_parallel and len(suspects_to_analyze) > 1:
+                # Suspects are independent; the only state they share is the
+                # feature cache, which is guarded by _FEATURE_CACHE_LOCK
+                with ThreadPoolExecutor(max_workers=min(8, len(suspects_to_analyze))) as pool:
+                    results = list(pool.map(analyze, suspects_to_analyze))
+            else:
+                results = [analyze(suspect) for suspect in suspects_to_analyze]
             
             if not results:
                 return "No suspects found for analysis."
             
-            # Sort by odd hour percentage (highest risk)
-            results.sort(key=lambda x: x.get('odd_hour_percentage', 0), reverse=True)
+            # Sort by odd hour percentage (highest risk); without the odd-hour
+            # analysis every key is 0 and the stable sort would be a no-op
+            if analyze_odd_hours and len(results) > 1:
+                results.sort(key=lambda x: x.get('odd_hour_percentage', 0), reverse=True)
             
             # Format response
             response = self._format_temporal_analysis(results, query)
@@ -85,25 +148,76 @@ class TemporalAnalysisTool(BaseTool):
         """Async not implemented"""
         raise NotImplementedError("Async execution not supported")
     
+    def _suspect_features(self, suspect: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Return the query-independent temporal features of a suspect, cached while their data is unchanged"""
+        # Suspects may be analyzed on several threads
+        with _FEATURE_CACHE_LOCK:
+            cached = self.feature_cache.get(suspect)
+            # The cached entry holds a reference to its frame, so an identity match cannot be a reused id
+            if cached is not None and cached[0] is df and cached[1] == len(df):
+                self.feature_cache.move_to_end(suspect)
+                return cached[2]
+        
+        # Filter out provider messages, keeping only the columns the detectors read
+        columns = [col for col in _TEMPORAL_COLUMNS if col in df.columns]
+        provider_mask = df.get('is_provider_message')
+        if provider_mask is None:
+            df_filtered = df.loc[:, columns]
+        else:
+            df_filtered = df.loc[~provider_mask.to_numpy(dtype=bool), columns]
+        
+        # Sorted once and shared by the burst and silence detectors; NaT never
+        # falls inside a window or gap, so it is dropped before sorting
+        valid = df_filtered['datetime'].notna().to_numpy()
+        ts = df_filtered['datetime'].to_numpy(dtype='datetime64[ns]').view('i8')[valid]
+        # Without a contact column every contact is missing (-1) and none is counted
+        if 'b_party_clean' in df_filtered.columns:
+            bp_codes = pd.factorize(df_filtered['b_party_clean'], sort=False)[0][valid]
+        else:
+            bp_codes = np.full(len(ts), -1, dtype=np.intp)
+        order = np.argsort(ts, kind='stable')
+        
+        hours = df_filtered['hour'].dropna().to_numpy(dtype=np.int8)
+        features = {
+            'n': len(df_filtered),
+            'ts': ts[order],
+            'bp_codes': bp_codes[order],
+            'hours': hours,
+            'hourly_dist': np.bincount(hours, minlength=24),
+            'day_counts': df_filtered['day_of_week'].value_counts(),
+        }
+        
+        with _FEATURE_CACHE_LOCK:
+            self.feature_cache[suspect] = (df, len(df), features)
+            if len(self.feature_cache) > _FEATURE_CACHE_SIZE:
+                self.feature_cache.popitem(last=False)
+        return features
+    
     def _analyze_suspect_temporal(self, suspect: str, df: pd.DataFrame, 
                                  analyze_odd: bool, analyze_bursts: bool, 
-                                 analyze_patterns: bool) -> Dict[str, Any]:
+                                 analyze_patterns: bool, skip_small: bool = False) -> Dict[str, Any]:
         """Analyze temporal patterns for a single suspect"""
-        # Filter out provider messages
-        df_filtered = df[~df.get('is_provider_message', False)].copy()
+        features = self._suspect_features(suspect, df)
+        n = features['n']
+        if n == 0:
+            return self._empty_temporal_analysis(suspect, analyze_odd, analyze_bursts, analyze_patterns, skip_small)
+        
+        hours = features['hours']
+        # Details of a skipped suspect are never shown, only its summary metrics
+        summary_only = skip_small and n < _MIN_CALLS_FOR_DETAIL
         
         analysis = {
             'suspect': suspect,
-            'total_calls': len(df_filtered),
-            'silent_periods': []
+            'total_calls': n,
+            'silent_periods': [],
+            'summary_only': summary_only
         }
         
         if analyze_odd:
             # Odd hour analysis
-            odd_hour_mask = (df_filtered['hour'] >= settings.odd_hour_start) & \
-                           (df_filtered['hour'] < settings.odd_hour_end)
-            odd_hour_calls = odd_hour_mask.sum()
-            odd_hour_pct = (odd_hour_calls / len(df_filtered) * 100) if len(df_filtered) > 0 else 0
+            odd_hour_calls = np.count_nonzero((hours >= settings.odd_hour_start) &
+                                              (hours < settings.odd_hour_end))
+            odd_hour_pct = odd_hour_calls / n * 100
             
             analysis.update({
                 'odd_hour_calls': odd_hour_calls,
@@ -111,108 +225,110 @@ class TemporalAnalysisTool(BaseTool):
                 'odd_hour_risk': 'HIGH' if odd_hour_pct > 3 else 'MEDIUM' if odd_hour_pct > 1 else 'LOW'
             })
         
-        if analyze_bursts:
+        if analyze_bursts and summary_only:
+            analysis['burst_count'] = len(_scan_bursts(
+                features['ts'], settings.call_burst_window * _NS_PER_MINUTE,
+                settings.call_burst_threshold, limit=5
+            ))
+        elif analyze_bursts:
             # Call burst detection
-            bursts = self._detect_call_bursts(df_filtered)
+            bursts = self._detect_call_bursts(features['ts'], features['bp_codes'])
             analysis['call_bursts'] = bursts
             analysis['burst_count'] = len(bursts)
         
         if analyze_patterns:
             # Pattern day analysis
-            pattern_activity = {}
-            for day in settings.pattern_days:
-                day_calls = df_filtered[df_filtered['day_of_week'] == day]
-                pattern_activity[day] = {
-                    'count': len(day_calls),
-                    'percentage': round((len(day_calls) / len(df_filtered) * 100), 2) if len(df_filtered) > 0 else 0
-                }
-            analysis['pattern_day_activity'] = pattern_activity
+            # Counts and unrounded percentages in settings.pattern_days order
+            pattern_counts = features['day_counts'].reindex(settings.pattern_days, fill_value=0).to_numpy()
+            pattern_pcts = pattern_counts / n * 100
+            analysis['pattern_counts'] = pattern_counts
+            analysis['pattern_pcts'] = pattern_pcts
             
             # Check for pattern day concentration
-            total_pattern_pct = sum(d['percentage'] for d in pattern_activity.values())
+            total_pattern_pct = sum(round(pct, 2) for pct in pattern_pcts.tolist())
             analysis['pattern_concentration'] = 'HIGH' if total_pattern_pct > 40 else 'MEDIUM' if total_pattern_pct > 25 else 'LOW'
         
         # Hourly distribution
-        hourly_dist = df_filtered['hour'].value_counts().sort_index()
-        peak_hours = hourly_dist.nlargest(3).index.tolist() if len(hourly_dist) > 0 else []
-        analysis['peak_hours'] = peak_hours
+        if not summary_only:
+            hourly_dist = features['hourly_dist']
+            peak_hours = np.argsort(-hourly_dist, kind='stable')[:3]
+            analysis['peak_hours'] = peak_hours[hourly_dist[peak_hours] > 0].tolist()
         
         # Silent period detection
-        silent_periods = self._detect_silent_periods(df_filtered)
+        silent_periods = self._detect_silent_periods(features['ts'])
         if silent_periods:
             analysis['silent_periods'] = silent_periods
             analysis['has_suspicious_silence'] = any(p['severity'] == 'HIGH' for p in silent_periods)
         
         return analysis
     
-    def _detect_call_bursts(self, df: pd.DataFrame) -> List[Dict]:
-        """Detect call bursts in the data"""
-        bursts = []
-        df_sorted = df.sort_values('datetime')
-        
-        window_minutes = settings.call_burst_window
+    def _empty_temporal_analysis(self, suspect: str, analyze_odd: bool, analyze_bursts: bool,
+                                 analyze_patterns: bool, skip_small: bool = False) -> Dict[str, Any]:
+        """Analysis for a suspect with no calls left after provider filtering"""
+        analysis = {
+            'suspect': suspect,
+            'total_calls': 0,
+            'silent_periods': [],
+            'peak_hours': [],
+            'summary_only': skip_small
+        }
+        if analyze_odd:
+            analysis.update({'odd_hour_calls': 0, 'odd_hour_percentage': 0, 'odd_hour_risk': 'LOW'})
+        if analyze_bursts:
+            analysis.update({'call_bursts': [], 'burst_count': 0})
+        if analyze_patterns:
+            analysis.update({
+                'pattern_counts': np.zeros(len(settings.pattern_days), dtype=np.int64),
+                'pattern_pcts': np.zeros(len(settings.pattern_days)),
+                'pattern_concentration': 'LOW'
+            })
+        return analysis
+    
+    def _detect_call_bursts(self, ts: np.ndarray, bp_codes: np.ndarray) -> List[Dict]:
+        """Detect call bursts in sorted int64 nanosecond timestamps"""
+        window_ns = settings.call_burst_window * _NS_PER_MINUTE
         threshold = settings.call_burst_threshold
         
-        i = 0
-        while i < len(df_sorted):
-            window_start = df_sorted.iloc[i]['datetime']
-            window_end = window_start + timedelta(minutes=window_minutes)
-            
-            # Count calls in window
-            calls_in_window = df_sorted[
-                (df_sorted['datetime'] >= window_start) & 
-                (df_sorted['datetime'] <= window_end)
-            ]
-            
-            if len(calls_in_window) >= threshold:
-                unique_numbers = calls_in_window['b_party_clean'].nunique()
-                bursts.append({
-                    'time': window_start.strftime('%Y-%m-%d %H:%M'),
-                    'calls': len(calls_in_window),
-                    'unique_contacts': unique_numbers,
-                    'suspicious': unique_numbers == 1  # Multiple calls to same number
-                })
-                # Skip past this burst
-                i += len(calls_in_window)
-            else:
-                i += 1
+        bursts = []
+        for start, lo, hi in _scan_bursts(ts, window_ns, threshold, limit=5):
+            # Missing numbers factorize to -1 and are not counted, as with nunique
+            window_codes = bp_codes[lo:hi]
+            unique_numbers = np.unique(window_codes[window_codes >= 0]).size
+            bursts.append({
+                'time': pd.Timestamp(ts[start]).strftime('%Y-%m-%d %H:%M'),
+                'calls': hi - lo,
+                'unique_contacts': unique_numbers,
+                'suspicious': unique_numbers == 1  # Multiple calls to same number
+            })
         
-        return bursts[:5]  # Return top 5 bursts
+        return bursts  # At most the first 5 bursts
     
-    def _detect_silent_periods(self, df: pd.DataFrame) -> List[Dict]:
-        """Detect unusual communication gaps"""
+    def _detect_silent_periods(self, ts: np.ndarray) -> List[Dict]:
+        """Detect unusual communication gaps in sorted int64 nanosecond timestamps"""
         silent_periods = []
         
-        if len(df) < 2:
+        if len(ts) < 2:
             return silent_periods
         
-        # Sort by datetime
-        df_sorted = df.sort_values('datetime')
-        
-        # Calculate gaps between communications
-        for i in range(len(df_sorted) - 1):
-            current_time = df_sorted.iloc[i]['datetime']
-            next_time = df_sorted.iloc[i+1]['datetime']
-            
-            gap_hours = (next_time - current_time).total_seconds() / 3600
-            
-            # Flag gaps > 48 hours as suspicious
-            if gap_hours > 48:
-                silent_periods.append({
-                    'start': current_time.strftime('%Y-%m-%d %H:%M'),
-                    'end': next_time.strftime('%Y-%m-%d %H:%M'),
-                    'duration_hours': round(gap_hours, 1),
-                    'severity': 'HIGH' if gap_hours > 72 else 'MEDIUM'
-                })
+        # Flag gaps > 48 hours as suspicious; only the first five are formatted
+        gaps = np.diff(ts)
+        for i in np.flatnonzero(gaps > 48 * _NS_PER_HOUR)[:5]:
+            gap_hours = float(gaps[i]) / 1e9 / 3600
+            silent_periods.append({
+                'start': pd.Timestamp(ts[i]).strftime('%Y-%m-%d %H:%M'),
+                'end': pd.Timestamp(ts[i + 1]).strftime('%Y-%m-%d %H:%M'),
+                'duration_hours': round(gap_hours, 1),
+                'severity': 'HIGH' if gap_hours > 72 else 'MEDIUM'
+            })
         
-        return silent_periods[:5]  # Return top 5 silent periods
+        return silent_periods
     
     def _format_temporal_analysis(self, results: list, query: str) -> str:
         """Format temporal analysis results"""
-        output = []
+        buf = io.StringIO()
         
-        output.append("⏰ TEMPORAL PATTERN ANALYSIS")
-        output.append("=" * 50)
+        buf.write("⏰ TEMPORAL PATTERN ANALYSIS\n")
+        buf.write("=" * 50 + "\n")
         
         # Identify high risk suspects
         high_odd_hour = [r for r in results if r.get('odd_hour_percentage', 0) > 3]
@@ -220,68 +336,69 @@ class TemporalAnalysisTool(BaseTool):
         high_pattern = [r for r in results if r.get('pattern_concentration') == 'HIGH']
         
         if high_odd_hour or high_bursts:
-            output.append("\n🚨 SUSPICIOUS TEMPORAL PATTERNS DETECTED")
+            buf.write("\n🚨 SUSPICIOUS TEMPORAL PATTERNS DETECTED\n")
         
         # Detailed results for each suspect
         for result in results:
             # Skip low-activity suspects unless specifically requested
-            if result['total_calls'] < 10 and "all" not in query.lower():
+            if result['summary_only']:
                 continue
             
-            output.append(f"\n📱 {result['suspect']}")
+            buf.write(f"\n📱 {result['suspect']}\n")
             
             # Odd hour analysis
             if 'odd_hour_percentage' in result:
                 risk_emoji = {'HIGH': '🔴', 'MEDIUM': '🟡', 'LOW': '🟢'}[result['odd_hour_risk']]
-                output.append(f"   Odd Hours: {risk_emoji} {result['odd_hour_percentage']}% ({result['odd_hour_calls']} calls)")
+                buf.write(f"   Odd Hours: {risk_emoji} {result['odd_hour_percentage']}% ({result['odd_hour_calls']} calls)\n")
             
             # Call bursts
             if 'burst_count' in result and result['burst_count'] > 0:
-                output.append(f"   Call Bursts: {result['burst_count']} detected")
+                buf.write(f"   Call Bursts: {result['burst_count']} detected\n")
                 for burst in result['call_bursts'][:2]:  # Show first 2
                     emoji = "🚨" if burst['suspicious'] else "📞"
-                    output.append(f"   {emoji} {burst['time']}: {burst['calls']} calls to {burst['unique_contacts']} numbers")
+                    buf.write(f"   {emoji} {burst['time']}: {burst['calls']} calls to {burst['unique_contacts']} numbers\n")
             
             # Pattern days
-            if 'pattern_day_activity' in result:
-                tuesday = result['pattern_day_activity'].get('Tuesday', {})
-                friday = result['pattern_day_activity'].get('Friday', {})
-                if tuesday.get('percentage', 0) > 20 or friday.get('percentage', 0) > 20:
-                    output.append(f"   Pattern Days: Tuesday {tuesday.get('percentage', 0)}%, Friday {friday.get('percentage', 0)}%")
+            if 'pattern_pcts' in result:
+                day_pcts = dict(zip(settings.pattern_days, result['pattern_pcts'].tolist()))
+                tuesday = round(day_pcts['Tuesday'], 2) if 'Tuesday' in day_pcts else 0
+                friday = round(day_pcts['Friday'], 2) if 'Friday' in day_pcts else 0
+                if tuesday > 20 or friday > 20:
+                    buf.write(f"   Pattern Days: Tuesday {tuesday}%, Friday {friday}%\n")
             
             # Peak hours
             if result.get('peak_hours'):
-                output.append(f"   Peak Hours: {', '.join(map(str, result['peak_hours']))}")
+                buf.write(f"   Peak Hours: {', '.join(map(str, result['peak_hours']))}\n")
             
             # Silent periods
             if result.get('silent_periods'):
-                output.append(f"   🔇 Silent Periods: {len(result['silent_periods'])} detected")
+                buf.write(f"   🔇 Silent Periods: {len(result['silent_periods'])} detected\n")
                 for period in result['silent_periods'][:2]:  # Show first 2
                     severity_emoji = "🚨" if period['severity'] == 'HIGH' else "⚠️"
-                    output.append(f"   {severity_emoji} {period['duration_hours']}h gap: {period['start']} to {period['end']}")
+                    buf.write(f"   {severity_emoji} {period['duration_hours']}h gap: {period['start']} to {period['end']}\n")
         
         # Risk summary
-        output.append("\n📊 TEMPORAL RISK SUMMARY:")
+        buf.write("\n📊 TEMPORAL RISK SUMMARY:\n")
         if high_odd_hour:
-            output.append(f"   🔴 High Odd-Hour Activity: {', '.join([r['suspect'] for r in high_odd_hour[:3]])}")
+            buf.write(f"   🔴 High Odd-Hour Activity: {', '.join([r['suspect'] for r in high_odd_hour[:3]])}\n")
         if high_bursts:
-            output.append(f"   🔴 Suspicious Call Bursts: {', '.join([r['suspect'] for r in high_bursts[:3]])}")
+            buf.write(f"   🔴 Suspicious Call Bursts: {', '.join([r['suspect'] for r in high_bursts[:3]])}\n")
         if high_pattern:
-            output.append(f"   🟡 Pattern Day Concentration: {', '.join([r['suspect'] for r in high_pattern[:3]])}")
+            buf.write(f"   🟡 Pattern Day Concentration: {', '.join([r['suspect'] for r in high_pattern[:3]])}\n")
         
         # Silent period suspects
         suspects_with_silence = [r for r in results if r.get('has_suspicious_silence')]
         if suspects_with_silence:
-            output.append(f"   🔇 Suspicious Silent Periods: {', '.join([r['suspect'] for r in suspects_with_silence[:3]])}")
+            buf.write(f"   🔇 Suspicious Silent Periods: {', '.join([r['suspect'] for r in suspects_with_silence[:3]])}\n")
         
         # Narcotics indicator
         if high_pattern and any(r.get('pattern_concentration') == 'HIGH' for r in results):
-            output.append("\n⚠️ NARCOTICS TRAFFICKING INDICATOR:")
-            output.append("   High activity on Tuesday/Friday detected - common drug transport days")
+            buf.write("\n⚠️ NARCOTICS TRAFFICKING INDICATOR:\n")
+            buf.write("   High activity on Tuesday/Friday detected - common drug transport days\n")
         
         # Silent period indicator
         if suspects_with_silence:
-            output.append("\n⚠️ POST-INCIDENT SILENCE INDICATOR:")
-            output.append("   Extended communication gaps detected - possible post-raid/arrest behavior")
+            buf.write("\n⚠️ POST-INCIDENT SILENCE INDICATOR:\n")
+            buf.write("   Extended communication gaps detected - possible post-raid/arrest behavior\n")
         
-        return "\n".join(output)
\ No newline at end of file
+        return buf.getvalue()
\ No newline at end of file
@@ -6,9 +6,122 @@ Detects and analyzes behavioral patterns in tower dump data
 from langchain.tools import BaseTool
 from typing import Dict, Any, List, Optional, Set
 import pandas as pd
-from datetime import datetime, timedelta
-from loguru import logger
 import numpy as np
+import io
+import re
+from collections import Counter, OrderedDict
+from types import MappingProxyType
+from dataclasses import dataclass
+from itertools import combinations
+from functools import cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import settings
+
+_FRAME_CACHE_SIZE = 32
+_NS_PER_HOUR = 3_600_000_000_000
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+_DEDUP_WINDOW_NS = 300 * 1_000_000_000
+_FRAME_CACHE_LOCK = threading.Lock()
+
+# Query keyword -> detector, in dispatch priority order
+_QUERY_HANDLERS = {
+    'frequent': '_detect_frequent_visitors',
+    'one-time': '_detect_one_time_visitors',
+    'one time': '_detect_one_time_visitors',
+    'reconnaissance': '_detect_reconnaissance_patterns',
+    'recon': '_detect_reconnaissance_patterns',
+    'group': '_detect_group_coordination',
+    'coordination': '_detect_group_coordination',
+    'burner': '_detect_burner_phones',
+    'new sim': '_detect_burner_phones',
+    'suspicious': '_detect_suspicious_behavior',
+}
+_QUERY_RE = re.compile('|'.join(map(re.escape, _QUERY_HANDLERS)))
+_HANDLER_PRIORITY = tuple(dict.fromkeys(_QUERY_HANDLERS.values()))
+
+# Sections of the comprehensive analysis, in report order
+_ANALYSES = (
+    ("Frequent Visitors", '_find_frequent_visitors'),
+    ("One-Time Visitors", '_find_one_time_visitors'),
+    ("Reconnaissance", '_find_reconnaissance_patterns'),
+    ("Group Coordination", '_find_group_coordination'),
+    ("Burner Phones", '_find_burner_phones'),
+    ("Suspicious Behavior", '_find_suspicious_behavior'),
+)
+
+@dataclass(slots=True)
+class BehaviorFindings:
+    """What a detector found, and the headline the overview shows for it (None when quiet)"""
+    headline: Optional[str]
+    details: Dict[str, Any]
+
+@cache
+def _get_logger():
+    """Import loguru on first use; the tool only logs when a detector fails"""
+    from loguru import logger
+    return logger
+
+def _coordination_windows(frame: pd.DataFrame, tower_key: pd.Series, window_ns: int) -> List[Dict[str, Any]]:
+    """Find every window of one dump where three or more numbers share a tower
+    
+    Module-level so that dumps can be scanned in worker processes.
+    """
+    patterns = []
+    
+    # One stable sort by (tower, time) leaves each tower's records in a
+    # contiguous time-ordered run; NaT sorts last and never falls inside a window
+    timestamps = frame['timestamp'].to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(timestamps)
+    ts_all = np.where(valid, timestamps.view('i8'), np.iinfo(np.int64).max)
+    tower_codes = tower_key.cat.codes.to_numpy()
+    order = np.lexsort((ts_all, tower_codes))
+    order = order[tower_codes[order] >= 0]
+    if not len(order):
+        # Empty dump, or no record with a tower
+        return patterns
+    # Numbers as integer codes so windows are deduplicated without hashing strings
+    number_codes, number_values = pd.factorize(frame['mobile_number'].to_numpy()[order], use_na_sentinel=False)
+    sorted_towers = tower_codes[order]
+    sorted_ts = ts_all[order]
+    sorted_valid = valid[order]
+    run_starts = np.flatnonzero(np.r_[True, sorted_towers[1:] != sorted_towers[:-1]])
+    run_ends = np.r_[run_starts[1:], len(order)]
+    
+    # Group by tower and time windows
+    for start, end in zip(run_starts, run_ends):
+        tower_id = tower_key.cat.categories[sorted_towers[start]]
+        n_valid = int(sorted_valid[start:end].sum())
+        ts = sorted_ts[start:start + n_valid]
+        mobs = number_codes[start:start + n_valid]
+        
+        # Window bounds for every start in two vectorised binary searches;
+        # lo also picks up earlier records sharing the start time
+        lo = np.searchsorted(ts, ts, side='left')
+        hi = np.searchsorted(ts, ts + window_ns, side='right')
+        
+        # A window needs at least three records to hold three numbers
+        for i in np.flatnonzero(hi - lo >= 3):
+            unique_numbers = pd.unique(mobs[lo[i]:hi[i]])
+            
+            # Check for coordination pattern
+            if len(unique_numbers) >= 3:
+                # Check if these numbers appear together elsewhere
+                patterns.append({
+                    'tower': tower_id,
+                    'timestamp': pd.Timestamp(ts[i]),
+                    'numbers': list(number_values[unique_numbers]),
+                    'count': len(unique_numbers),
+                    'duration': (ts[hi[i] - 1] - ts[lo[i]]) / 1e9
+                })
+    
+    return patterns
+
 
 class BehaviorPatternTool(BaseTool):
     """Tool for detecting behavioral patterns in tower dump data"""
@@ -27,12 +140,19 @@ class BehaviorPatternTool(BaseTool):
     # Class attributes for Pydantic v2
     tower_dump_data: Dict[str, Any] = {}
     thresholds: Dict[str, Any] = {}
+    frame_cache: Dict[str, Any] = {}
+    analysis_cache: Dict[str, Any] = {}
     
     def __init__(self):
         super().__init__()
         
-        # Pattern thresholds
-        self.thresholds = {
+        # Derived time arrays per dump, reused across queries
+        self.frame_cache = OrderedDict()
+        # Last report per analysis, reused until the loaded dumps change
+        self.analysis_cache = {}
+        
+        # Pattern thresholds, read-only once the tool is built
+        self.thresholds = MappingProxyType({
             'frequent_visitor_days': 3,  # Days to consider frequent
             'frequent_visitor_count': 5,  # Min visits to be frequent
             'one_time_threshold': 1,  # Max visits for one-time
@@ -41,7 +161,7 @@ class BehaviorPatternTool(BaseTool):
             'suspicious_duration': 300,  # Seconds for brief suspicious visits
             'new_sim_days': 7,  # Days to consider SIM as new
             'burner_phone_activity': 10  # Max activity for burner phone
-        }
+        })
     
     def _run(self, query: str) -> str:
         """Execute behavior pattern detection"""
@@ -52,35 +172,121 @@ class BehaviorPatternTool(BaseTool):
         try:
             query_lower = query.lower()
             
-            if "frequent" in query_lower:
-                return self._detect_frequent_visitors()
-            elif "one-time" in query_lower or "one time" in query_lower:
-                return self._detect_one_time_visitors()
-            elif "reconnaissance" in query_lower or "recon" in query_lower:
-                return self._detect_reconnaissance_patterns()
-            elif "group" in query_lower or "coordination" in query_lower:
-                return self._detect_group_coordination()
-            elif "burner" in query_lower or "new sim" in query_lower:
-                return self._detect_burner_phones()
-            elif "suspicious" in query_lower:
-                return self._detect_suspicious_behavior()
-            else:
-                return self._comprehensive_behavior_analysis()
+            # One scan for every keyword; when several match, the earliest
+            # handler in _QUERY_HANDLERS wins
+            matched = {_QUERY_HANDLERS[keyword] for keyword in _QUERY_RE.findall(query_lower)}
+            handler = next((name for name in _HANDLER_PRIORITY if name in matched), None)
+            return self._memoized_analysis(handler or '_comprehensive_behavior_analysis')
                 
         except Exception as e:
-            logger.error(f"Error in behavior pattern detection: {str(e)}")
+            _get_logger().error(f"Error in behavior pattern detection: {str(e)}")
             return f"Error detecting patterns: {str(e)}"
     
     async def _arun(self, query: str) -> str:
         """Async version"""
         return self._run(query)
     
-    def _detect_frequent_visitors(self) -> str:
-        """Detect frequent visitors to towers"""
+    def _memoized_analysis(self, method: str) -> Any:
+        """Run an analysis by method name, reusing its last result while the loaded dumps are unchanged"""
+        # Snapshots hold the frames themselves, so identity checks cannot match a reused id
+        snapshot = [(dump_id, df, len(df)) for dump_id, df in self.tower_dump_data.items()]
+        cached = self.analysis_cache.get(method)
+        if cached is not None and len(cached[0]) == len(snapshot) and all(
+            old[0] == new[0] and old[1] is new[1] and old[2] == new[2]
+            for old, new in zip(cached[0], snapshot)
+        ):
+            return cached[1]
         
-        results = []
-        results.append("🔄 FREQUENT VISITOR ANALYSIS")
-        results.append("=" * 80)
+        report = getattr(self, method)()
+        self.analysis_cache[method] = (snapshot, report)
+        return report
+    
+    def _frame_entry(self, dump_id: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Return the derived-data cache entry for a dump, starting afresh when its frame changes"""
+        # Detectors may run on several threads during the comprehensive analysis
+        with _FRAME_CACHE_LOCK:
+            cached = self.frame_cache.get(dump_id)
+            # The cached entry holds a reference to its frame, so an identity match cannot be a reused id
+            if cached is not None and cached[0] is df and cached[1] == len(df):
+                self.frame_cache.move_to_end(dump_id)
+                return cached[2]
+            
+            entry = {}
+            self.frame_cache[dump_id] = (df, len(df), entry)
+            if len(self.frame_cache) > _FRAME_CACHE_SIZE:
+                self.frame_cache.popitem(last=False)
+            return entry
+    
+    def _column(self, dump_id: str, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Return one column of a dump as a cached NumPy array"""
+        entry = self._frame_entry(dump_id, df)
+        values = entry.get(('column', column))
+        if values is None:
+            values = entry[('column', column)] = df[column].to_numpy()
+        return values
+    
+    def _key_codes(self, dump_id: str, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Return the int64 category codes of an identifier column (-1 where missing), cached"""
+        entry = self._frame_entry(dump_id, df)
+        codes = entry.get(('codes', column))
+        if codes is None:
+            codes = entry[('codes', column)] = self._group_key(dump_id, df, column).cat.codes.to_numpy().astype(np.int64)
+        return codes
+    
+    def _number_stats(self, dump_id: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a dump's per-number activity statistics, computed in one grouped pass and shared by the detectors
+        
+        Rows are indexed by the categorical number key, in category-code order.
+        Callers must not modify the returned frame.
+        """
+        entry = self._frame_entry(dump_id, df)
+        stats = entry.get('number_stats')
+        if stats is None:
+            aggregations = {
+                'first_seen': ('timestamp', 'min'),
+                'last_seen': ('timestamp', 'max'),
+                'total_activity': ('timestamp', 'size'),
+            }
+            if 'tower_id' in df.columns:
+                aggregations['unique_towers'] = ('tower_id', 'nunique')
+            if 'imei' in df.columns:
+                aggregations['unique_imeis'] = ('imei', 'nunique')
+            key = self._group_key(dump_id, df, 'mobile_number')
+            stats = entry['number_stats'] = df.groupby(key, observed=True).agg(**aggregations)
+        return stats
+    
+    def _time_features(self, dump_id: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Return a dump's int64 timestamps, day codes and hours"""
+        entry = self._frame_entry(dump_id, df)
+        if 'ts_ns' not in entry:
+            timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+            ts_ns = timestamps.view('i8')
+            valid = ~np.isnat(timestamps)
+            # Published in one update so a concurrent reader never sees a partial entry
+            entry.update({
+                'ts_ns': ts_ns,
+                'date_code': timestamps.astype('datetime64[D]').view('i8'),
+                # NaT gets hour -1 so it never falls inside an hour range
+                'hour': np.where(valid, ts_ns // _NS_PER_HOUR % 24, -1).astype(np.int8),
+            })
+        return entry
+    
+    def _group_key(self, dump_id: str, df: pd.DataFrame, column: str) -> pd.Series:
+        """Return an identifier column as a categorical, so groupby works on integer codes
+        
+        The shared frame is left untouched; other tools still see the original strings.
+        """
+        entry = self._frame_entry(dump_id, df)
+        key = entry.get(column)
+        if key is None:
+            key = entry[column] = df[column].astype('category')
+        return key
+    
+    def _find_frequent_visitors(self) -> BehaviorFindings:
+        """Collect each tower's frequent visitors"""
+        
+        min_days = self.thresholds['frequent_visitor_days']
+        min_visits = self.thresholds['frequent_visitor_count']
         
         frequent_visitors = {}
         
@@ -88,37 +294,48 @@ class BehaviorPatternTool(BaseTool):
             if 'mobile_number' not in df.columns or 'timestamp' not in df.columns:
                 continue
             
-            # Add date column
-            df['date'] = df['timestamp'].dt.date
-            
-            # Analyze each tower
+            # Analyze each tower: visits and distinct days per (tower, number)
+            # in one grouped pass, using the cached day codes instead of a date
+            # column written into the shared frame
             if 'tower_id' in df.columns:
-                for tower_id, tower_group in df.groupby('tower_id'):
-                    # Count visits per number
-                    number_stats = tower_group.groupby('mobile_number').agg({
-                        'timestamp': 'count',
-                        'date': 'nunique'
-                    }).rename(columns={'timestamp': 'visit_count', 'date': 'unique_days'})
-                    
-                    # Filter frequent visitors
-                    freq_mask = (
-                        (number_stats['unique_days'] >= self.thresholds['frequent_visitor_days']) |
-                        (number_stats['visit_count'] >= self.thresholds['frequent_visitor_count'])
-                    )
-                    
-                    tower_frequent = number_stats[freq_mask]
-                    
-                    if len(tower_frequent) > 0:
-                        if tower_id not in frequent_visitors:
-                            frequent_visitors[tower_id] = []
-                        
-                        for number, stats in tower_frequent.iterrows():
-                            frequent_visitors[tower_id].append({
-                                'number': number,
-                                'visits': stats['visit_count'],
-                                'days': stats['unique_days'],
-                                'frequency': stats['visit_count'] / stats['unique_days']
-                            })
+                features = self._time_features(dump_id, df)
+                valid = features['hour'] >= 0
+                visits = pd.DataFrame({
+                    'visit_count': valid,
+                    'unique_days': np.where(valid, features['date_code'], np.nan)
+                }, index=df.index)
+                number_stats = visits.groupby(
+                    [self._group_key(dump_id, df, 'tower_id'), self._group_key(dump_id, df, 'mobile_number')],
+                    observed=True
+                ).agg({'visit_count': 'sum', 'unique_days': 'nunique'})
+                
+                # Filter frequent visitors
+                freq_mask = (
+                    (number_stats['unique_days'] >= min_days) |
+                    (number_stats['visit_count'] >= min_visits)
+                )
+                
+                for (tower_id, number), stats in number_stats[freq_mask].iterrows():
+                    frequent_visitors.setdefault(tower_id, []).append({
+                        'number': number,
+                        'visits': stats['visit_count'],
+                        'days': stats['unique_days'],
+                        'frequency': stats['visit_count'] / stats['unique_days']
+                    })
+        
+        return BehaviorFindings(None, {
+            'frequent_visitors': frequent_visitors,
+        })
+    
+    def _detect_frequent_visitors(self) -> str:
+        """Detect frequent visitors to towers"""
+        
+        findings = self._memoized_analysis('_find_frequent_visitors')
+        frequent_visitors = findings.details['frequent_visitors']
+        
+        results = []
+        results.append("🔄 FREQUENT VISITOR ANALYSIS")
+        results.append("=" * 80)
         
         # Report findings
         if frequent_visitors:
@@ -138,9 +355,11 @@ class BehaviorPatternTool(BaseTool):
                 # Top visitors for this tower
                 top_visitors = sorted(visitors, key=lambda x: x['visits'], reverse=True)[:3]
                 for visitor in top_visitors:
-                    results.append(f"   📱 {visitor['number']}")
-                    results.append(f"      Visits: {visitor['visits']} over {visitor['days']} days")
-                    results.append(f"      Daily Average: {visitor['frequency']:.1f} visits/day")
+                    results.append(
+                        f"   📱 {visitor['number']}\n"
+                        f"      Visits: {visitor['visits']} over {visitor['days']} days\n"
+                        f"      Daily Average: {visitor['frequency']:.1f} visits/day"
+                    )
         
         # Pattern analysis
         results.append("\n🎯 BEHAVIORAL PATTERNS:")
@@ -165,12 +384,10 @@ class BehaviorPatternTool(BaseTool):
         
         return "\n".join(results)
     
-    def _detect_one_time_visitors(self) -> str:
-        """Detect one-time visitors"""
+    def _find_one_time_visitors(self) -> BehaviorFindings:
+        """Collect one-time visitors per tower and those seen at odd hours"""
         
-        results = []
-        results.append("👤 ONE-TIME VISITOR ANALYSIS")
-        results.append("=" * 80)
+        max_visits = self.thresholds['one_time_threshold']
         
         one_time_visitors = {}
         crime_window_visitors = []
@@ -181,35 +398,55 @@ class BehaviorPatternTool(BaseTool):
             
             # Overall visit counts
             visit_counts = df['mobile_number'].value_counts()
-            one_timers = visit_counts[visit_counts <= self.thresholds['one_time_threshold']]
+            one_timers = visit_counts[visit_counts <= max_visits]
             
-            # Analyze by tower
+            # Analyze by tower, looking only at one-time numbers' records
             if 'tower_id' in df.columns:
-                for tower_id, tower_group in df.groupby('tower_id'):
+                one_time_mask = df['mobile_number'].isin(one_timers.index).to_numpy()
+                one_time_rows = df[one_time_mask]
+                # Keep the one_timers ordering; the stable sort leaves each number's records in frame order
+                rank = one_timers.index.get_indexer(one_time_rows['mobile_number'])
+                order = np.argsort(rank, kind='stable')
+                one_time_rows = one_time_rows.iloc[order]
+                tower_key = self._group_key(dump_id, df, 'tower_id')[one_time_mask].iloc[order]
+                
+                for tower_id, tower_group in one_time_rows.groupby(tower_key, observed=True):
                     tower_one_timers = []
                     
-                    for number in one_timers.index:
-                        if number in tower_group['mobile_number'].values:
-                            # Get details of the visit
-                            visit_data = tower_group[tower_group['mobile_number'] == number].iloc[0]
-                            
-                            visitor_info = {
-                                'number': number,
-                                'timestamp': visit_data.get('timestamp'),
-                                'duration': visit_data.get('duration', 0) if 'duration' in visit_data else 0,
-                                'imei': visit_data.get('imei', 'Unknown') if 'imei' in visit_data else 'Unknown'
-                            }
-                            
-                            tower_one_timers.append(visitor_info)
-                            
-                            # Check if during crime window (night/odd hours)
-                            if 'timestamp' in visit_data and pd.notna(visit_data['timestamp']):
-                                hour = visit_data['timestamp'].hour
-                                if 0 <= hour <= 5:
-                                    crime_window_visitors.append(visitor_info)
+                    # Get details of each number's first visit
+                    for visit_data in tower_group.drop_duplicates('mobile_number').to_dict('records'):
+                        visitor_info = {
+                            'number': visit_data['mobile_number'],
+                            'timestamp': visit_data.get('timestamp'),
+                            'duration': visit_data.get('duration', 0),
+                            'imei': visit_data.get('imei', 'Unknown')
+                        }
+                        
+                        tower_one_timers.append(visitor_info)
+                        
+                        # Check if during crime window (night/odd hours)
+                        if pd.notna(visitor_info['timestamp']):
+                            hour = visitor_info['timestamp'].hour
+                            if 0 <= hour <= 5:
+                                crime_window_visitors.append(visitor_info)
                     
-                    if tower_one_timers:
-                        one_time_visitors[tower_id] = tower_one_timers
+                    one_time_visitors[tower_id] = tower_one_timers
+        
+        return BehaviorFindings(None, {
+            'one_time_visitors': one_time_visitors,
+            'crime_window_visitors': crime_window_visitors,
+        })
+    
+    def _detect_one_time_visitors(self) -> str:
+        """Detect one-time visitors"""
+        
+        findings = self._memoized_analysis('_find_one_time_visitors')
+        one_time_visitors = findings.details['one_time_visitors']
+        crime_window_visitors = findings.details['crime_window_visitors']
+        
+        results = []
+        results.append("👤 ONE-TIME VISITOR ANALYSIS")
+        results.append("=" * 80)
         
         # Report findings
         total_one_timers = sum(len(visitors) for visitors in one_time_visitors.values())
@@ -245,23 +482,23 @@ class BehaviorPatternTool(BaseTool):
         # High-risk one-time visitors
         if crime_window_visitors:
             results.append(f"\n🚨 HIGH-RISK ONE-TIME VISITORS (Odd Hours): {len(crime_window_visitors)}")
-            results.append("   ⚠️ One-time appearance during suspicious hours indicates:")
-            results.append("      - Possible burner phone")
-            results.append("      - External operative")
-            results.append("      - Reconnaissance activity")
+            results.append(
+                "   ⚠️ One-time appearance during suspicious hours indicates:\n"
+                "      - Possible burner phone\n"
+                "      - External operative\n"
+                "      - Reconnaissance activity"
+            )
             
             for visitor in crime_window_visitors[:5]:
-                results.append(f"\n   🔴 {visitor['number']}")
-                results.append(f"      Time: {visitor['timestamp']}")
+                results.append(f"\n   🔴 {visitor['number']}\n      Time: {visitor['timestamp']}")
         
         return "\n".join(results)
     
-    def _detect_reconnaissance_patterns(self) -> str:
-        """Detect potential reconnaissance behavior"""
+    def _find_reconnaissance_patterns(self) -> BehaviorFindings:
+        """Score numbers for reconnaissance indicators"""
         
-        results = []
-        results.append("🔍 RECONNAISSANCE PATTERN DETECTION")
-        results.append("=" * 80)
+        recon_days = self.thresholds['recon_pattern_days']
+        suspicious_duration = self.thresholds['suspicious_duration']
         
         recon_suspects = {}
         
@@ -269,65 +506,120 @@ class BehaviorPatternTool(BaseTool):
             if not all(col in df.columns for col in ['mobile_number', 'timestamp', 'tower_id']):
                 continue
             
-            # Add date column
-            df['date'] = df['timestamp'].dt.date
+            # Skip numbers with too many records (likely not recon). Per-number
+            # totals and sightings come from the shared per-dump statistics,
+            # whose rows follow the category codes
+            number_stats = self._number_stats(dump_id, df)
+            is_candidate = (number_stats['total_activity'] <= 100).to_numpy()
+            all_codes = self._key_codes(dump_id, df, 'mobile_number')
+            candidate_mask = (all_codes >= 0) & is_candidate[all_codes]
+            if not candidate_mask.any():
+                continue
             
-            # For each number, analyze visit patterns
-            for number, number_group in df.groupby('mobile_number'):
-                # Skip if too many records (likely not recon)
-                if len(number_group) > 100:
-                    continue
-                
-                # Analyze tower visit patterns
-                tower_visits = number_group.groupby('tower_id').agg({
-                    'timestamp': ['count', 'min', 'max'],
-                    'date': 'nunique'
-                })
-                
-                # Flatten column names
-                tower_visits.columns = ['visit_count', 'first_visit', 'last_visit', 'unique_days']
-                
-                # Reconnaissance indicators
-                recon_score = 0
+            # Score every number from whole-frame group reductions rather than
+            # a Python loop over each number's group
+            stats = pd.DataFrame({
+                'total_visits': number_stats['total_activity'],
+                'first_seen': number_stats['first_seen'],
+                'last_seen': number_stats['last_seen'],
+            })[is_candidate]
+            
+            # Distinct active hours per number from (number, hour) pair codes
+            features = self._time_features(dump_id, df)
+            number_codes = all_codes[candidate_mask]
+            n_numbers = len(number_stats)
+            hours = features['hour'][candidate_mask]
+            timed = (number_codes >= 0) & (hours >= 0)
+            hour_pairs = np.unique(number_codes[timed] * 24 + hours[timed])
+            stats['active_hours'] = np.bincount(hour_pairs // 24, minlength=n_numbers)[stats.index.codes]
+            
+            # Analyze tower visit patterns. Candidates have at most 100 records,
+            # so (number, tower) pairs are tallied from integer pair codes
+            # instead of a two-level groupby over many tiny groups
+            tower_codes = self._key_codes(dump_id, df, 'tower_id')[candidate_mask]
+            n_towers = len(self._group_key(dump_id, df, 'tower_id').cat.categories)
+            paired = (number_codes >= 0) & (tower_codes >= 0)
+            pairs, pair_index = np.unique(number_codes[paired] * n_towers + tower_codes[paired], return_inverse=True)
+            pair_number = pairs // n_towers
+            ts = features['ts_ns'][candidate_mask][paired]
+            timed = features['hour'][candidate_mask][paired] >= 0
+            pair_visits = np.bincount(pair_index[timed], minlength=len(pairs))
+            stats['towers_visited'] = np.bincount(pair_number, minlength=n_numbers)[stats.index.codes]
+            stats['brief_towers'] = np.bincount(pair_number[pair_visits <= 3], minlength=n_numbers)[stats.index.codes]
+            
+            # Spread of first visits across towers, in whole days; numbers
+            # whose visits are all untimed get NaN
+            no_time = np.iinfo(np.int64).max
+            pair_first = np.full(len(pairs), no_time)
+            np.minimum.at(pair_first, pair_index[timed], ts[timed])
+            has_first = pair_first != no_time
+            earliest = np.full(n_numbers, no_time)
+            latest = np.full(n_numbers, np.iinfo(np.int64).min)
+            np.minimum.at(earliest, pair_number[has_first], pair_first[has_first])
+            np.maximum.at(latest, pair_number[has_first], pair_first[has_first])
+            date_span = np.where(earliest != no_time, (latest - earliest) // _NS_PER_DAY, np.nan)
+            stats['date_span'] = date_span[stats.index.codes]
+            
+            # Reconnaissance indicators
+            # 1. Multiple towers visited briefly
+            brief = stats['brief_towers'] >= 3
+            # 2. Progressive tower exploration over days
+            progressive = (
+                (stats['towers_visited'] >= 3) &
+                (stats['date_span'] >= 3) &
+                (stats['date_span'] <= recon_days)
+            )
+            # 3. Short duration visits
+            if 'duration' in df.columns:
+                # One comparison over the raw durations, counted per number
+                # code and read back in stats order
+                keep = number_codes >= 0
+                short_flags = self._column(dump_id, df, 'duration')[candidate_mask][keep] < suspicious_duration
+                short_visits = np.bincount(number_codes[keep], weights=short_flags, minlength=n_numbers)
+                mostly_short = pd.Series(
+                    short_visits[stats.index.codes] > stats['total_visits'].to_numpy() * 0.7, index=stats.index
+                )
+            else:
+                mostly_short = pd.Series(False, index=stats.index)
+            # 4. Activity in limited hours
+            limited_hours = stats['active_hours'] <= 3
+            
+            recon_scores = 2 * brief + 3 * progressive + 2 * mostly_short + 1 * limited_hours
+            
+            # Store if suspicious
+            for number in stats.index[recon_scores.to_numpy() >= 3]:
+                row = stats.loc[number]
                 indicators = []
-                
-                # 1. Multiple towers visited briefly
-                brief_visits = tower_visits[tower_visits['visit_count'] <= 3]
-                if len(brief_visits) >= 3:
-                    recon_score += 2
-                    indicators.append(f"Brief visits to {len(brief_visits)} towers")
-                
-                # 2. Progressive tower exploration
-                first_visits = tower_visits['first_visit'].sort_values()
-                if len(first_visits) >= 3:
-                    # Check if visits are spread over days
-                    date_span = (first_visits.iloc[-1] - first_visits.iloc[0]).days
-                    if date_span >= 3 and date_span <= self.thresholds['recon_pattern_days']:
-                        recon_score += 3
-                        indicators.append(f"Progressive exploration over {date_span} days")
-                
-                # 3. Short duration visits
-                if 'duration' in number_group.columns:
-                    short_visits = number_group[number_group['duration'] < self.thresholds['suspicious_duration']]
-                    if len(short_visits) > len(number_group) * 0.7:
-                        recon_score += 2
-                        indicators.append("Majority short-duration visits")
-                
-                # 4. Specific time patterns
-                hour_distribution = number_group['timestamp'].dt.hour.value_counts()
-                if len(hour_distribution) <= 3:  # Activity in limited hours
-                    recon_score += 1
+                if brief[number]:
+                    indicators.append(f"Brief visits to {row['brief_towers']} towers")
+                if progressive[number]:
+                    indicators.append(f"Progressive exploration over {int(row['date_span'])} days")
+                if mostly_short[number]:
+                    indicators.append("Majority short-duration visits")
+                if limited_hours[number]:
                     indicators.append("Activity in specific hours only")
                 
-                # Store if suspicious
-                if recon_score >= 3:
-                    recon_suspects[number] = {
-                        'score': recon_score,
-                        'indicators': indicators,
-                        'towers_visited': len(tower_visits),
-                        'total_visits': len(number_group),
-                        'date_range': f"{number_group['date'].min()} to {number_group['date'].max()}"
-                    }
+                recon_suspects[number] = {
+                    'score': int(recon_scores[number]),
+                    'indicators': indicators,
+                    'towers_visited': int(row['towers_visited']),
+                    'total_visits': int(row['total_visits']),
+                    'date_range': f"{row['first_seen'].date()} to {row['last_seen'].date()}"
+                }
+        
+        return BehaviorFindings("📋 RECONNAISSANCE PATTERNS IDENTIFIED:", {
+            'recon_suspects': recon_suspects,
+        })
+    
+    def _detect_reconnaissance_patterns(self) -> str:
+        """Detect potential reconnaissance behavior"""
+        
+        findings = self._memoized_analysis('_find_reconnaissance_patterns')
+        recon_suspects = findings.details['recon_suspects']
+        
+        results = []
+        results.append("🔍 RECONNAISSANCE PATTERN DETECTION")
+        results.append("=" * 80)
         
         # Report findings
         if recon_suspects:
@@ -341,128 +633,128 @@ class BehaviorPatternTool(BaseTool):
             )
             
             for number, data in sorted_suspects[:10]:
-                results.append(f"\n📱 {number}")
-                results.append(f"   Reconnaissance Score: {data['score']}/10")
-                results.append(f"   Date Range: {data['date_range']}")
-                results.append(f"   Towers Visited: {data['towers_visited']}")
-                results.append(f"   Total Visits: {data['total_visits']}")
-                results.append("   Indicators:")
-                for indicator in data['indicators']:
-                    results.append(f"     • {indicator}")
+                results.append(
+                    f"\n📱 {number}\n"
+                    f"   Reconnaissance Score: {data['score']}/10\n"
+                    f"   Date Range: {data['date_range']}\n"
+                    f"   Towers Visited: {data['towers_visited']}\n"
+                    f"   Total Visits: {data['total_visits']}\n"
+                    "   Indicators:"
+                )
+                results.extend(f"     • {indicator}" for indicator in data['indicators'])
         
         # Pattern summary
-        results.append("\n📋 RECONNAISSANCE PATTERNS IDENTIFIED:")
-        results.append("  • Brief visits to multiple locations")
-        results.append("  • Progressive area exploration")
-        results.append("  • Limited time window activity")
-        results.append("  • Short duration connections")
+        results.append(
+            f"\n{findings.headline}\n"
+            "  • Brief visits to multiple locations\n"
+            "  • Progressive area exploration\n"
+            "  • Limited time window activity\n"
+            "  • Short duration connections"
+        )
         
         return "\n".join(results)
     
+    def _find_group_coordination(self) -> BehaviorFindings:
+        """Collect de-duplicated coordination windows and how often numbers share them"""
+        
+        window_ns = int(self.thresholds['group_time_window'] * 1e9)
+        
+        dumps = [
+            (df[['mobile_number', 'timestamp']], self._group_key(dump_id, df, 'tower_id'))
+            for dump_id, df in self.tower_dump_data.items()
+            if all(col in df.columns for col in ['mobile_number', 'timestamp', 'tower_id'])
+        ]
+        
+        if settings.behavior_analysis_workers > 1 and len(dumps) > 1:
+            # Dumps are independent and the window scan is a Python loop, so
+            # separate processes sidestep the GIL
+            with ProcessPoolExecutor(max_workers=min(settings.behavior_analysis_workers, len(dumps))) as pool:
+                futures = [pool.submit(_coordination_windows, frame, tower_key, window_ns) for frame, tower_key in dumps]
+                per_dump = [future.result() for future in futures]
+        else:
+            per_dump = [_coordination_windows(frame, tower_key, window_ns) for frame, tower_key in dumps]
+        coordination_patterns = [pattern for patterns in per_dump for pattern in patterns]
+        
+        # Remove duplicates and overlapping windows. Accepted patterns are
+        # bucketed by (tower, 5-minute slot); anything within 300s of a
+        # pattern lives in its own slot or one of the two neighbours
+        unique_patterns = []
+        accepted_sigs = {}
+        for pattern in coordination_patterns:
+            pattern_ns = pattern['timestamp'].value
+            bucket = pattern_ns // _DEDUP_WINDOW_NS
+            members = frozenset(pattern['numbers'])
+            min_overlap = len(pattern['numbers']) * 0.7
+            is_duplicate = any(
+                abs(existing_ns - pattern_ns) < _DEDUP_WINDOW_NS and
+                len(existing_members & members) > min_overlap
+                for slot in (bucket - 1, bucket, bucket + 1)
+                for existing_ns, existing_members in accepted_sigs.get((pattern['tower'], slot), ())
+            )
+            
+            if not is_duplicate:
+                unique_patterns.append(pattern)
+                accepted_sigs.setdefault((pattern['tower'], bucket), []).append((pattern_ns, members))
+        
+        # Track which numbers appear together; sorting each group once
+        # makes every emitted pair come out ordered
+        number_associations = Counter()
+        for pattern in unique_patterns:
+            number_associations.update(combinations(sorted(pattern['numbers']), 2))
+        
+        headline = f"🎯 COORDINATION EVENTS DETECTED: {len(unique_patterns)}" if coordination_patterns else None
+        return BehaviorFindings(headline, {
+            'unique_patterns': unique_patterns,
+            'number_associations': number_associations,
+        })
+    
     def _detect_group_coordination(self) -> str:
         """Detect coordinated group activities"""
         
+        findings = self._memoized_analysis('_find_group_coordination')
+        unique_patterns = findings.details['unique_patterns']
+        number_associations = findings.details['number_associations']
+        
         results = []
         results.append("👥 GROUP COORDINATION DETECTION")
         results.append("=" * 80)
         
-        coordination_patterns = []
-        
-        for dump_id, df in self.tower_dump_data.items():
-            if not all(col in df.columns for col in ['mobile_number', 'timestamp', 'tower_id']):
-                continue
-            
-            # Sort by timestamp
-            df_sorted = df.sort_values('timestamp')
-            
-            # Group by tower and time windows
-            for tower_id, tower_group in df_sorted.groupby('tower_id'):
-                # Create time windows
-                tower_sorted = tower_group.sort_values('timestamp')
-                
-                # Sliding window analysis
-                for i in range(len(tower_sorted)):
-                    window_start = tower_sorted.iloc[i]['timestamp']
-                    window_end = window_start + timedelta(seconds=self.thresholds['group_time_window'])
-                    
-                    # Find all numbers in this window
-                    window_mask = (
-                        (tower_sorted['timestamp'] >= window_start) &
-                        (tower_sorted['timestamp'] <= window_end)
-                    )
-                    window_data = tower_sorted[window_mask]
-                    
-                    unique_numbers = window_data['mobile_number'].unique()
-                    
-                    # Check for coordination pattern
-                    if len(unique_numbers) >= 3:
-                        # Check if these numbers appear together elsewhere
-                        coordination_patterns.append({
-                            'tower': tower_id,
-                            'timestamp': window_start,
-                            'numbers': list(unique_numbers),
-                            'count': len(unique_numbers),
-                            'duration': (window_data['timestamp'].max() - window_data['timestamp'].min()).total_seconds()
-                        })
-        
         # Analyze coordination patterns
-        if coordination_patterns:
-            # Remove duplicates and overlapping windows
-            unique_patterns = []
-            for pattern in coordination_patterns:
-                is_duplicate = False
-                for existing in unique_patterns:
-                    if (existing['tower'] == pattern['tower'] and
-                        abs((existing['timestamp'] - pattern['timestamp']).total_seconds()) < 300 and
-                        len(set(existing['numbers']) & set(pattern['numbers'])) > len(pattern['numbers']) * 0.7):
-                        is_duplicate = True
-                        break
-                
-                if not is_duplicate:
-                    unique_patterns.append(pattern)
-            
-            results.append(f"\n🎯 COORDINATION EVENTS DETECTED: {len(unique_patterns)}")
+        if findings.headline:
+            results.append(f"\n{findings.headline}")
             
             # Sort by group size
             sorted_patterns = sorted(unique_patterns, key=lambda x: x['count'], reverse=True)
             
             for pattern in sorted_patterns[:5]:
-                results.append(f"\n📍 Tower: {pattern['tower']}")
-                results.append(f"   Time: {pattern['timestamp']}")
-                results.append(f"   Group Size: {pattern['count']} numbers")
-                results.append(f"   Duration: {pattern['duration']:.0f} seconds")
-                results.append(f"   Numbers: {', '.join(pattern['numbers'][:3])}...")
+                results.append(
+                    f"\n📍 Tower: {pattern['tower']}\n"
+                    f"   Time: {pattern['timestamp']}\n"
+                    f"   Group Size: {pattern['count']} numbers\n"
+                    f"   Duration: {pattern['duration']:.0f} seconds\n"
+                    f"   Numbers: {', '.join(pattern['numbers'][:3])}..."
+                )
             
             # Find recurring groups
             results.append("\n🔗 RECURRING GROUP ANALYSIS:")
             
-            # Track which numbers appear together
-            number_associations = {}
-            for pattern in unique_patterns:
-                for i, num1 in enumerate(pattern['numbers']):
-                    for num2 in pattern['numbers'][i+1:]:
-                        pair = tuple(sorted([num1, num2]))
-                        number_associations[pair] = number_associations.get(pair, 0) + 1
-            
             # Find strong associations
-            strong_associations = {
-                pair: count for pair, count in number_associations.items()
-                if count >= 2
-            }
+            strong_count = sum(1 for count in number_associations.values() if count >= 2)
             
-            if strong_associations:
-                results.append(f"\n  Strong Associations Found: {len(strong_associations)}")
-                for pair, count in list(strong_associations.items())[:5]:
+            if strong_count:
+                results.append(f"\n  Strong Associations Found: {strong_count}")
+                for pair, count in number_associations.most_common(5):
+                    if count < 2:
+                        break
                     results.append(f"    • {pair[0]} ↔ {pair[1]}: {count} co-occurrences")
         
         return "\n".join(results)
     
-    def _detect_burner_phones(self) -> str:
-        """Detect potential burner phones and new SIMs"""
+    def _find_burner_phones(self) -> BehaviorFindings:
+        """Score numbers as burner phones and group new SIMs by activation date"""
         
-        results = []
-        results.append("🔥 BURNER PHONE / NEW SIM DETECTION")
-        results.append("=" * 80)
+        new_sim_days = self.thresholds['new_sim_days']
+        max_activity = self.thresholds['burner_phone_activity']
         
         burner_suspects = {}
         new_sims = {}
@@ -471,66 +763,96 @@ class BehaviorPatternTool(BaseTool):
             if 'mobile_number' not in df.columns or 'timestamp' not in df.columns:
                 continue
             
-            # Analyze each number
-            for number, group in df.groupby('mobile_number'):
-                # Calculate activity span
-                first_seen = group['timestamp'].min()
-                last_seen = group['timestamp'].max()
-                activity_span = (last_seen - first_seen).days
-                
-                # Burner phone indicators
-                burner_score = 0
-                indicators = []
-                
-                # 1. Short activity span with limited records
-                if activity_span <= self.thresholds['new_sim_days'] and len(group) <= self.thresholds['burner_phone_activity']:
-                    burner_score += 3
-                    indicators.append(f"Limited activity over {activity_span} days")
-                
-                # 2. One-way communication pattern
-                # (This would need CDR integration to fully implement)
-                
-                # 3. Odd hour activity
-                if 'timestamp' in group.columns:
-                    odd_hour_activity = group[group['timestamp'].dt.hour.between(0, 5)]
-                    if len(odd_hour_activity) > len(group) * 0.5:
-                        burner_score += 2
+            # Odd-hour (midnight to 5 AM) counts for every number in one bincount
+            # over the category codes; every category occurs, so they line up
+            # with the shared per-number statistics
+            numbers = self._group_key(dump_id, df, 'mobile_number')
+            hours = self._time_features(dump_id, df)['hour']
+            codes = self._key_codes(dump_id, df, 'mobile_number')
+            keep = codes >= 0
+            number_stats = self._number_stats(dump_id, df)
+            stats = number_stats.assign(odd_hour_calls=np.bincount(
+                codes[keep], weights=(hours[keep] <= 5) & (hours[keep] >= 0), minlength=len(number_stats)
+            ).astype(np.int64))
+            activity_span = (stats['last_seen'] - stats['first_seen']).dt.days
+            
+            # Burner phone indicators
+            # 1. Short activity span with limited records
+            recent = activity_span <= new_sim_days
+            limited = recent & (stats['total_activity'] <= max_activity)
+            # 2. One-way communication pattern
+            # (This would need CDR integration to fully implement)
+            # 3. Odd hour activity
+            odd_hours = stats['odd_hour_calls'] > stats['total_activity'] * 0.5
+            burner_scores = 3 * limited + 2 * odd_hours
+            # 4. Limited tower usage
+            if 'unique_towers' in stats.columns:
+                few_towers = stats['unique_towers'] <= 2
+                burner_scores += few_towers
+            # 5. No IMEI or changing IMEI
+            if 'unique_imeis' in stats.columns:
+                burner_scores += (stats['unique_imeis'] == 0) + 2 * (stats['unique_imeis'] > 1)
+            
+            # Categorize; indicators are only spelled out for suspected burners
+            for number in stats.index[(burner_scores >= 4).to_numpy() | recent.to_numpy()]:
+                row = stats.loc[number]
+                span = int(activity_span[number])
+                if burner_scores[number] >= 4:
+                    indicators = []
+                    if limited[number]:
+                        indicators.append(f"Limited activity over {span} days")
+                    if odd_hours[number]:
                         indicators.append("Majority activity in odd hours")
-                
-                # 4. Limited tower usage
-                if 'tower_id' in group.columns:
-                    unique_towers = group['tower_id'].nunique()
-                    if unique_towers <= 2:
-                        burner_score += 1
-                        indicators.append(f"Used only {unique_towers} tower(s)")
-                
-                # 5. No IMEI or changing IMEI
-                if 'imei' in group.columns:
-                    unique_imeis = group['imei'].dropna().nunique()
-                    if unique_imeis == 0:
-                        burner_score += 1
-                        indicators.append("No IMEI recorded")
-                    elif unique_imeis > 1:
-                        burner_score += 2
-                        indicators.append(f"Multiple IMEIs ({unique_imeis})")
-                
-                # Categorize
-                if burner_score >= 4:
+                    if 'unique_towers' in stats.columns and few_towers[number]:
+                        indicators.append(f"Used only {row['unique_towers']} tower(s)")
+                    if 'unique_imeis' in stats.columns:
+                        if row['unique_imeis'] == 0:
+                            indicators.append("No IMEI recorded")
+                        elif row['unique_imeis'] > 1:
+                            indicators.append(f"Multiple IMEIs ({row['unique_imeis']})")
+                    
                     burner_suspects[number] = {
-                        'score': burner_score,
+                        'score': int(burner_scores[number]),
                         'indicators': indicators,
-                        'first_seen': first_seen,
-                        'last_seen': last_seen,
-                        'total_activity': len(group),
-                        'activity_span': activity_span
+                        'first_seen': row['first_seen'],
+                        'last_seen': row['last_seen'],
+                        'total_activity': int(row['total_activity']),
+                        'activity_span': span
                     }
-                elif activity_span <= self.thresholds['new_sim_days']:
+                else:
                     new_sims[number] = {
-                        'first_seen': first_seen,
-                        'activity_days': activity_span,
-                        'total_activity': len(group)
+                        'first_seen': row['first_seen'],
+                        'activity_days': span,
+                        'total_activity': int(row['total_activity'])
                     }
         
+        # Group new SIMs by activation date and flag bulk activations
+        activation_dates = {}
+        for number, data in new_sims.items():
+            activation_dates.setdefault(data['first_seen'].date(), []).append(number)
+        bulk_activations = {
+            date: numbers for date, numbers in activation_dates.items()
+            if len(numbers) >= 3
+        }
+        
+        return BehaviorFindings("⚠️ BULK ACTIVATIONS DETECTED:" if bulk_activations else None, {
+            'burner_suspects': burner_suspects,
+            'new_sims': new_sims,
+            'bulk_activations': bulk_activations,
+        })
+    
+    def _detect_burner_phones(self) -> str:
+        """Detect potential burner phones and new SIMs"""
+        
+        findings = self._memoized_analysis('_find_burner_phones')
+        burner_suspects = findings.details['burner_suspects']
+        new_sims = findings.details['new_sims']
+        bulk_activations = findings.details['bulk_activations']
+        
+        results = []
+        results.append("🔥 BURNER PHONE / NEW SIM DETECTION")
+        results.append("=" * 80)
+        
         # Report findings
         if burner_suspects:
             results.append(f"\n🔴 SUSPECTED BURNER PHONES: {len(burner_suspects)}")
@@ -542,45 +864,28 @@ class BehaviorPatternTool(BaseTool):
             )
             
             for number, data in sorted_suspects[:10]:
-                results.append(f"\n📱 {number}")
-                results.append(f"   Burner Score: {data['score']}/8")
-                results.append(f"   Active: {data['first_seen'].date()} to {data['last_seen'].date()}")
-                results.append(f"   Total Activity: {data['total_activity']} records")
-                results.append("   Indicators:")
-                for indicator in data['indicators']:
-                    results.append(f"     • {indicator}")
+                results.append(
+                    f"\n📱 {number}\n"
+                    f"   Burner Score: {data['score']}/8\n"
+                    f"   Active: {data['first_seen'].date()} to {data['last_seen'].date()}\n"
+                    f"   Total Activity: {data['total_activity']} records\n"
+                    "   Indicators:"
+                )
+                results.extend(f"     • {indicator}" for indicator in data['indicators'])
         
         if new_sims:
             results.append(f"\n🆕 NEWLY ACTIVATED SIMS: {len(new_sims)}")
             results.append("   (Active less than 7 days)")
             
-            # Group by activation date
-            activation_dates = {}
-            for number, data in new_sims.items():
-                date = data['first_seen'].date()
-                if date not in activation_dates:
-                    activation_dates[date] = []
-                activation_dates[date].append(number)
-            
-            # Check for bulk activations
-            bulk_activations = {
-                date: numbers for date, numbers in activation_dates.items()
-                if len(numbers) >= 3
-            }
-            
             if bulk_activations:
-                results.append("\n   ⚠️ BULK ACTIVATIONS DETECTED:")
+                results.append(f"\n   {findings.headline}")
                 for date, numbers in bulk_activations.items():
                     results.append(f"     {date}: {len(numbers)} SIMs activated")
         
         return "\n".join(results)
     
-    def _detect_suspicious_behavior(self) -> str:
-        """Comprehensive suspicious behavior detection"""
-        
-        results = []
-        results.append("🚨 SUSPICIOUS BEHAVIOR ANALYSIS")
-        results.append("=" * 80)
+    def _find_suspicious_behavior(self) -> BehaviorFindings:
+        """Score numbers for suspicious behavior"""
         
         suspicious_numbers = {}
         
@@ -588,55 +893,99 @@ class BehaviorPatternTool(BaseTool):
             if 'mobile_number' not in df.columns:
                 continue
             
-            for number, group in df.groupby('mobile_number'):
-                suspicion_score = 0
+            # Order records by (number, time) once; every check below is then a
+            # single pass of per-number bincount sums over the sorted arrays
+            codes = self._key_codes(dump_id, df, 'mobile_number')
+            numbers = self._group_key(dump_id, df, 'mobile_number').cat.categories
+            has_time = 'timestamp' in df.columns
+            if has_time:
+                features = self._time_features(dump_id, df)
+                valid = features['hour'] >= 0
+                # NaT sorts last within its number, as with sort_values
+                sort_ts = np.where(valid, features['ts_ns'], np.iinfo(np.int64).max)
+                order = np.lexsort((sort_ts, codes))
+            else:
+                order = np.argsort(codes, kind='stable')
+            order = order[codes[order] >= 0]
+            sorted_codes = codes[order]
+            group_start = np.ones(len(order), dtype=bool)
+            group_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+            
+            def per_number(flags: np.ndarray) -> np.ndarray:
+                return np.bincount(sorted_codes, weights=flags, minlength=len(numbers))
+            
+            total_activity = np.bincount(sorted_codes, minlength=len(numbers))
+            suspicion_scores = np.zeros(len(numbers), dtype=np.int64)
+            
+            # 1. Odd hour concentration
+            if has_time:
+                hours = features['hour'][order]
+                odd_hour_ratio = per_number((hours >= 0) & (hours <= 5)) / np.maximum(total_activity, 1)
+                high_odd_hours = odd_hour_ratio > 0.3
+                suspicion_scores += 2 * high_odd_hours
+            
+            # 2. Brief connections
+            if 'duration' in df.columns:
+                brief = per_number(self._column(dump_id, df, 'duration')[order] < 60) > total_activity * 0.5
+                suspicion_scores += brief
+            
+            # 3. Tower hopping: the first record and any change of tower count,
+            # and a missing tower never equals the previous one
+            if 'tower_id' in df.columns and has_time:
+                tower_codes = self._key_codes(dump_id, df, 'tower_id')[order]
+                changed = group_start.copy()
+                changed[1:] |= tower_codes[1:] != tower_codes[:-1]
+                changed |= tower_codes < 0
+                tower_hopping = (total_activity > 10) & (per_number(changed) > total_activity * 0.7)
+                suspicion_scores += 2 * tower_hopping
+            
+            # 4. Silent periods followed by bursts
+            if has_time:
+                ts_ns = features['ts_ns'][order]
+                sorted_valid = valid[order]
+                long_gap = np.zeros(len(order), dtype=bool)
+                long_gap[1:] = (
+                    ~group_start[1:] & sorted_valid[1:] & sorted_valid[:-1] &
+                    (ts_ns[1:] - ts_ns[:-1] > 24 * _NS_PER_HOUR)
+                )
+                long_gaps = per_number(long_gap).astype(np.int64)
+                suspicion_scores += long_gaps > 0
+            
+            # Store if suspicious
+            for code in np.flatnonzero(suspicion_scores >= 3):
                 behaviors = []
+                if has_time and high_odd_hours[code]:
+                    behaviors.append(f"High odd-hour activity ({odd_hour_ratio[code]*100:.1f}%)")
+                if 'duration' in df.columns and brief[code]:
+                    behaviors.append("Majority brief connections (<60s)")
+                if 'tower_id' in df.columns and has_time and tower_hopping[code]:
+                    behaviors.append("Frequent tower switching")
+                if has_time and long_gaps[code] > 0:
+                    behaviors.append(f"Long silent periods ({long_gaps[code]} instances)")
                 
-                # 1. Odd hour concentration
-                if 'timestamp' in group.columns:
-                    hours = group['timestamp'].dt.hour
-                    odd_hour_ratio = len(hours[hours.between(0, 5)]) / len(hours)
-                    if odd_hour_ratio > 0.3:
-                        suspicion_score += 2
-                        behaviors.append(f"High odd-hour activity ({odd_hour_ratio*100:.1f}%)")
-                
-                # 2. Brief connections
-                if 'duration' in group.columns:
-                    brief_connections = group[group['duration'] < 60]
-                    if len(brief_connections) > len(group) * 0.5:
-                        suspicion_score += 1
-                        behaviors.append("Majority brief connections (<60s)")
-                
-                # 3. Tower hopping
-                if 'tower_id' in group.columns and 'timestamp' in group.columns:
-                    sorted_group = group.sort_values('timestamp')
-                    tower_changes = (sorted_group['tower_id'] != sorted_group['tower_id'].shift()).sum()
-                    
-                    if len(sorted_group) > 10 and tower_changes > len(sorted_group) * 0.7:
-                        suspicion_score += 2
-                        behaviors.append("Frequent tower switching")
-                
-                # 4. Silent periods followed by bursts
-                if 'timestamp' in group.columns:
-                    sorted_times = group['timestamp'].sort_values()
-                    time_gaps = sorted_times.diff()
-                    
-                    long_gaps = time_gaps[time_gaps > timedelta(hours=24)]
-                    if len(long_gaps) > 0:
-                        suspicion_score += 1
-                        behaviors.append(f"Long silent periods ({len(long_gaps)} instances)")
-                
-                # Store if suspicious
-                if suspicion_score >= 3:
-                    suspicious_numbers[number] = {
-                        'score': suspicion_score,
-                        'behaviors': behaviors,
-                        'total_activity': len(group)
-                    }
+                suspicious_numbers[numbers[code]] = {
+                    'score': int(suspicion_scores[code]),
+                    'behaviors': behaviors,
+                    'total_activity': int(total_activity[code])
+                }
+        
+        return BehaviorFindings(f"🎯 SUSPICIOUS NUMBERS IDENTIFIED: {len(suspicious_numbers)}" if suspicious_numbers else None, {
+            'suspicious_numbers': suspicious_numbers,
+        })
+    
+    def _detect_suspicious_behavior(self) -> str:
+        """Comprehensive suspicious behavior detection"""
+        
+        findings = self._memoized_analysis('_find_suspicious_behavior')
+        suspicious_numbers = findings.details['suspicious_numbers']
+        
+        results = []
+        results.append("🚨 SUSPICIOUS BEHAVIOR ANALYSIS")
+        results.append("=" * 80)
         
         # Report findings
         if suspicious_numbers:
-            results.append(f"\n🎯 SUSPICIOUS NUMBERS IDENTIFIED: {len(suspicious_numbers)}")
+            results.append(f"\n{findings.headline}")
             
             # Sort by suspicion score
             sorted_suspects = sorted(
@@ -647,56 +996,55 @@ class BehaviorPatternTool(BaseTool):
             
             # Categorize by risk level
             high_risk = [s for s in sorted_suspects if s[1]['score'] >= 5]
-            medium_risk = [s for s in sorted_suspects if 3 <= s[1]['score'] < 5]
+            # Medium-risk rows only ever show the score, so keep just that
+            medium_risk = [(number, data['score']) for number, data in sorted_suspects if 3 <= data['score'] < 5]
             
             if high_risk:
                 results.append(f"\n🔴 HIGH RISK ({len(high_risk)} numbers):")
                 for number, data in high_risk[:5]:
-                    results.append(f"\n  📱 {number}")
-                    results.append(f"     Risk Score: {data['score']}")
-                    for behavior in data['behaviors']:
-                        results.append(f"     • {behavior}")
+                    results.append(f"\n  📱 {number}\n     Risk Score: {data['score']}")
+                    results.extend(f"     • {behavior}" for behavior in data['behaviors'])
             
             if medium_risk:
                 results.append(f"\n🟡 MEDIUM RISK ({len(medium_risk)} numbers):")
-                for number, data in medium_risk[:3]:
-                    results.append(f"\n  📱 {number}")
-                    results.append(f"     Risk Score: {data['score']}")
+                results.extend(f"\n  📱 {number}\n     Risk Score: {score}" for number, score in medium_risk[:3])
         
         return "\n".join(results)
     
     def _comprehensive_behavior_analysis(self) -> str:
         """Provide comprehensive behavioral analysis"""
         
-        results = []
-        results.append("📊 COMPREHENSIVE BEHAVIORAL ANALYSIS")
-        results.append("=" * 80)
+        buf = io.StringIO()
+        buf.write("📊 COMPREHENSIVE BEHAVIORAL ANALYSIS\n")
+        buf.write("=" * 80 + "\n")
         
-        # Run all analyses
-        analyses = {
-            "Frequent Visitors": self._detect_frequent_visitors(),
-            "One-Time Visitors": self._detect_one_time_visitors(),
-            "Reconnaissance": self._detect_reconnaissance_patterns(),
-            "Group Coordination": self._detect_group_coordination(),
-            "Burner Phones": self._detect_burner_phones(),
-            "Suspicious Behavior": self._detect_suspicious_behavior()
-        }
+        # Run all analyses; only their findings are needed, so no sub-report is rendered
+        if settings.behavior_analysis_parallel:
+            # The detectors only read the dumps, and most of their work is
+            # pandas/NumPy code that releases the GIL
+            with ThreadPoolExecutor(max_workers=len(_ANALYSES)) as pool:
+                futures = {name: pool.submit(self._memoized_analysis, method) for name, method in _ANALYSES}
+                analyses = {name: future.result() for name, future in futures.items()}
+        else:
+            analyses = {name: self._memoized_analysis(method) for name, method in _ANALYSES}
         
         # Summary statistics
-        total_numbers = set()
-        for dump_id, df in self.tower_dump_data.items():
-            if 'mobile_number' in df.columns:
-                total_numbers.update(df['mobile_number'].unique())
+        # Only the count is reported, so it comes from the cached categorical
+        # keys: each dump's distinct numbers are its categories, and missing
+        # numbers (code -1) count once between them
+        numbered = [(dump_id, df) for dump_id, df in self.tower_dump_data.items() if 'mobile_number' in df.columns]
+        total_numbers = 0
+        if numbered:
+            categories = [self._group_key(dump_id, df, 'mobile_number').cat.categories for dump_id, df in numbered]
+            total_numbers = categories[0].append(categories[1:]).nunique() + any(
+                (self._key_codes(dump_id, df, 'mobile_number') < 0).any() for dump_id, df in numbered
+            )
         
-        results.append(f"\nTotal Unique Numbers Analyzed: {len(total_numbers)}")
+        buf.write(f"\nTotal Unique Numbers Analyzed: {total_numbers}\n")
         
-        # Extract key findings from each analysis
-        for analysis_type, analysis_result in analyses.items():
-            # Extract first few lines as summary
-            lines = analysis_result.split('\n')
-            key_finding = next((line for line in lines if 'DETECTED:' in line or 'IDENTIFIED:' in line), None)
-            
-            if key_finding:
-                results.append(f"\n{analysis_type}: {key_finding.strip()}")
+        # Report each analysis' headline finding
+        for analysis_type, findings in analyses.items():
+            if findings.headline:
+                buf.write(f"\n{analysis_type}: {findings.headline}\n")
         
-        return "\n".join(results)
\ No newline at end of file
+        return buf.getvalue()
\ No newline at end of file
@@ -6,10 +6,98 @@ Links tower dump data with CDR and IPDR records for comprehensive analysis
 from langchain.tools import BaseTool
 from typing import Dict, Any, List, Optional, Set, Tuple
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from loguru import logger
 import numpy as np
-from collections import defaultdict
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import settings
+
+# Identifier column of each data source, shared through one codebook
+_ID_COLUMNS = {'tower': 'mobile_number', 'cdr': 'a_party', 'ipdr': 'subscriber_id'}
+
+# Ten-digit phone number embedded in an IPDR suspect name
+_PHONE_RE = re.compile(r'\d{10}')
+
+# Columns of a linked (tower record, IPDR session) frame
+_SESSION_COLUMNS = [
+    'tower_row', 'number_code', 'mobile_number', 'tower_time', 'tower_id', 'number_rank',
+    'session_start', 'app', 'encrypted', 'data_volume'
+]
+
+def _window_pairs(left_keys: np.ndarray, left_ts: np.ndarray, right_keys: np.ndarray,
+                  right_ts: np.ndarray, tol_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Find every (left, right) row pair with equal keys and times at most tol_ns apart
+    
+    Right rows are sorted by (key, time) once; each left row's window bounds
+    are then located among them with a lexicographic search, done as a stable
+    sort of the bounds merged with the right rows. Returns positional indices,
+    grouped by left row and ascending in right time within each group.
+    """
+    order = np.lexsort((right_ts, right_keys))
+    sorted_keys, sorted_ts = right_keys[order], right_ts[order]
+    
+    def bounds(ts: np.ndarray, before: bool) -> np.ndarray:
+        # Ties put a lower bound before equal right rows and an upper bound
+        # after them, so the count of right rows ahead of each bound is a
+        # left- or right-sided search respectively
+        keys = np.concatenate([sorted_keys, left_keys])
+        times = np.concatenate([sorted_ts, ts])
+        is_right = np.concatenate([np.ones(len(sorted_ts), dtype=np.int8), np.zeros(len(ts), dtype=np.int8)])
+        merged = np.lexsort((is_right if before else -is_right, times, keys))
+        positions = np.empty(len(merged), dtype=np.int64)
+        positions[merged] = np.cumsum(is_right[merged]) - is_right[merged]
+        return positions[len(sorted_ts):]
+    
+    lo = bounds(left_ts - tol_ns, before=True)
+    hi = bounds(left_ts + tol_ns, before=False)
+    counts = hi - lo
+    left_idx = np.repeat(np.arange(len(left_ts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return left_idx, order[np.repeat(lo, counts) + offsets]
+
+def _link_by_time(left: pd.DataFrame, right: pd.DataFrame, left_time: str, right_time: str,
+                  tol_ns: int) -> pd.DataFrame:
+    """Join left rows to right rows of the same number code whose times are at most tol_ns apart
+    
+    Module-level so that pairs of frames can be linked in worker processes.
+    Links come back in left row order, then right row order, so a left frame
+    sorted once serves every right frame it is linked against. merge_asof
+    would keep just the nearest right row per left row, so all rows in each
+    window are found with _window_pairs; missing numbers (-1) and NaT never match.
+    """
+    left_ts = left[left_time].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    right_ts = right[right_time].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    left_rows = np.flatnonzero((left['number_code'].to_numpy() >= 0) & (left_ts != np.iinfo(np.int64).min))
+    right_rows = np.flatnonzero((right['number_code'].to_numpy() >= 0) & (right_ts != np.iinfo(np.int64).min))
+    
+    left_idx, right_idx = _window_pairs(
+        left['number_code'].to_numpy()[left_rows], left_ts[left_rows],
+        right['number_code'].to_numpy()[right_rows], right_ts[right_rows],
+        tol_ns
+    )
+    left_idx, right_idx = left_rows[left_idx], right_rows[right_idx]
+    order = np.lexsort((right_idx, left_idx))
+    return pd.concat([
+        left.iloc[left_idx[order]].reset_index(drop=True),
+        right.iloc[right_idx[order]].drop(columns='number_code').reset_index(drop=True)
+    ], axis=1)
+
+def _run_pairs(function, tasks: List[tuple]) -> List[Any]:
+    """Run a link function over (dump, source) pairs, in worker processes when configured"""
+    if settings.cross_reference_workers > 1 and len(tasks) > 1:
+        # Pairs are independent and mostly pandas work, so separate
+        # processes sidestep the GIL
+        with ProcessPoolExecutor(max_workers=min(settings.cross_reference_workers, len(tasks))) as pool:
+            futures = [pool.submit(function, *task) for task in tasks]
+            return [future.result() for future in futures]
+    return [function(*task) for task in tasks]
 
 class CrossReferenceTool(BaseTool):
     """Tool for cross-referencing tower dump with CDR/IPDR data"""
@@ -30,10 +118,14 @@ class CrossReferenceTool(BaseTool):
     cdr_data: Dict[str, Any] = {}
     ipdr_data: Dict[str, Any] = {}
     params: Dict[str, Any] = {}
+    codebook: Dict[str, Any] = {}
     
     def __init__(self):
         super().__init__()
         
+        # Shared identifier codes, rebuilt when the loaded data changes
+        self.codebook = {}
+        
         # Cross-reference parameters
         self.params = {
             'time_tolerance_minutes': 5,    # Time tolerance for matching
@@ -74,589 +166,478 @@ class CrossReferenceTool(BaseTool):
         """Async version"""
         return self._run(query)
     
-    def _find_silent_devices(self) -> str:
-        """Find devices present in tower dump but silent in CDR/IPDR"""
-        
-        results = []
-        results.append("🔇 SILENT DEVICE DETECTION")
-        results.append("=" * 80)
-        
-        # Collect all devices from tower dump
-        tower_devices = set()
-        tower_device_times = {}
-        
-        for dump_id, df in self.tower_dump_data.items():
-            if 'mobile_number' in df.columns:
-                devices = df['mobile_number'].unique()
-                tower_devices.update(devices)
-                
-                # Track time ranges for each device
-                if 'timestamp' in df.columns:
-                    for device in devices:
-                        device_data = df[df['mobile_number'] == device]
-                        if device not in tower_device_times:
-                            tower_device_times[device] = []
-                        
-                        tower_device_times[device].append({
-                            'start': device_data['timestamp'].min(),
-                            'end': device_data['timestamp'].max(),
-                            'records': len(device_data)
-                        })
+    def _id_codebook(self) -> Dict[str, Any]:
+        """Factorize the tower, CDR and IPDR identifiers into one shared int32 codebook
+        
+        Codes follow first appearance across the sources and are -1 for
+        missing identifiers. The book is only rebuilt when the loaded frames change.
+        """
+        sources = {'tower': self.tower_dump_data, 'cdr': self.cdr_data, 'ipdr': self.ipdr_data}
+        # Snapshots hold the frames themselves, so identity checks cannot match a reused id
+        snapshot = [(source, key, df, len(df)) for source, frames in sources.items() for key, df in frames.items()]
+        cached = self.codebook.get('snapshot')
+        if cached is not None and len(cached) == len(snapshot) and all(
+            old[:2] == new[:2] and old[2] is new[2] and old[3] == new[3]
+            for old, new in zip(cached, snapshot)
+        ):
+            return self.codebook
+        
+        columns = [
+            (source, key, df[_ID_COLUMNS[source]])
+            for source, key, df, _ in snapshot
+            if _ID_COLUMNS[source] in df.columns
+        ]
+        if columns:
+            codes, numbers = pd.factorize(pd.concat([column for _, _, column in columns], ignore_index=True))
+        else:
+            codes, numbers = np.empty(0, dtype=np.intp), pd.Index([], dtype=object)
+        
+        book = {'snapshot': snapshot, 'numbers': numbers, 'tower': {}, 'cdr': {}, 'ipdr': {}, 'categorical': {}, 'derived': {}}
+        codes = codes.astype(np.int32)
+        offset = 0
+        for source, key, column in columns:
+            book[source][key] = codes[offset:offset + len(column)]
+            offset += len(column)
+        
+        # Distinct codes per source; a missing identifier counts once, as in a set
+        book['devices'] = {
+            source: np.unique(np.concatenate([np.empty(0, dtype=np.int32), *book[source].values()]))
+            for source in sources
+        }
         
-        # Collect devices with CDR activity
-        cdr_devices = set()
-        cdr_activity = {}
+        self.codebook = book
+        return book
+    
+    def _categorical(self, source: str, key: str, column: str) -> pd.Series:
+        """Return a column of a loaded frame as a categorical, cached with the codebook
+        
+        The frames are shared with the other tools, so they are not converted
+        in place; the copy is dropped with the codebook when the data changes.
+        """
+        categorical = self._id_codebook()['categorical']
+        cached = categorical.get((source, key, column))
+        if cached is None:
+            frames = {'tower': self.tower_dump_data, 'cdr': self.cdr_data, 'ipdr': self.ipdr_data}[source]
+            cached = categorical[(source, key, column)] = frames[key][column].astype('category')
+        return cached
+    
+    def _derived(self, method: str) -> Any:
+        """Build derived data by method name, reusing it with the codebook while the loaded frames are unchanged"""
+        derived = self._id_codebook()['derived']
+        if method not in derived:
+            derived[method] = getattr(self, method)()
+        return derived[method]
+    
+    def _link_frames(self) -> Tuple[List[pd.DataFrame], List[pd.DataFrame]]:
+        """Frame every usable dump's tower records and every usable CDR's calls for linking"""
+        book = self._id_codebook()
+        tower_frames = []
+        for dump_id, tower_df in self.tower_dump_data.items():
+            if all(col in tower_df.columns for col in ['mobile_number', 'timestamp', 'tower_id']):
+                tower = pd.DataFrame({
+                    'tower_row': np.arange(len(tower_df)),
+                    'number_code': book['tower'][dump_id],
+                    'mobile_number': tower_df['mobile_number'].to_numpy(),
+                    'tower_time': tower_df['timestamp'].to_numpy(),
+                    'tower_id': tower_df['tower_id'].to_numpy(),
+                })
+                # Numbers are taken in order of first appearance within the dump;
+                # sorting by them once orders the links of every CDR and IPDR
+                tower['number_rank'] = tower.groupby('number_code', sort=False).ngroup()
+                tower_frames.append(tower.sort_values('number_rank', kind='stable', ignore_index=True))
+        cdr_frames = [
+            pd.DataFrame({
+                'cdr_row': np.arange(len(cdr_df)),
+                'number_code': book['cdr'][suspect],
+                'cdr_time': cdr_df['datetime'].to_numpy(),
+                'b_party': cdr_df['b_party'].to_numpy() if 'b_party' in cdr_df.columns else 'Unknown',
+                'duration': cdr_df['duration'].to_numpy() if 'duration' in cdr_df.columns else 0,
+            })
+            for suspect, cdr_df in self.cdr_data.items()
+            if all(col in cdr_df.columns for col in ['a_party', 'datetime'])
+        ]
         
-        if self.cdr_data:
-            for suspect, cdr_df in self.cdr_data.items():
-                if 'a_party' in cdr_df.columns:
-                    numbers = cdr_df['a_party'].unique()
-                    cdr_devices.update(numbers)
-                    
-                    # Track CDR activity times
-                    if 'datetime' in cdr_df.columns:
-                        for number in numbers:
-                            if number not in cdr_activity:
-                                cdr_activity[number] = []
-                            
-                            number_cdrs = cdr_df[cdr_df['a_party'] == number]
-                            cdr_activity[number].append({
-                                'start': number_cdrs['datetime'].min(),
-                                'end': number_cdrs['datetime'].max(),
-                                'call_count': len(number_cdrs)
-                            })
+        return tower_frames, cdr_frames
+    
+    def _session_frames(self) -> List[pd.DataFrame]:
+        """Frame every linkable IPDR's sessions, keyed by subscriber or by the number in the IPDR's name"""
+        book = self._id_codebook()
+        session_frames = []
+        for suspect, ipdr_df in self.ipdr_data.items():
+            if 'start_time' not in ipdr_df.columns:
+                continue
+            if 'subscriber_id' in ipdr_df.columns:
+                codes = book['ipdr'][suspect]
+            else:
+                # Without subscriber IDs every session belongs to the number
+                # named in the IPDR's key
+                match = _PHONE_RE.search(suspect)
+                if not match:
+                    continue
+                codes = np.full(len(ipdr_df), book['numbers'].get_indexer([match.group()])[0], dtype=np.int32)
+            session_frames.append(pd.DataFrame({
+                'number_code': codes,
+                'session_start': ipdr_df['start_time'].to_numpy(),
+                'app': ipdr_df['detected_app'].to_numpy() if 'detected_app' in ipdr_df.columns else 'Unknown',
+                'encrypted': ipdr_df['is_encrypted'].to_numpy() if 'is_encrypted' in ipdr_df.columns else False,
+                'data_volume': ipdr_df['total_data_volume'].to_numpy() if 'total_data_volume' in ipdr_df.columns else 0,
+            }))
+        
+        return session_frames
+    
+    def _tower_times(self) -> np.ndarray:
+        """Sort every dump's tower record times, as int64 nanoseconds, into one array"""
+        tower_times = np.sort(np.concatenate([np.empty(0, dtype=np.int64)] + [
+            tower_df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            for tower_df in self.tower_dump_data.values()
+            if 'timestamp' in tower_df.columns
+        ]))
+        return tower_times[tower_times != np.iinfo(np.int64).min]  # NaT matches nothing
+    
+    def _find_silent_devices(self) -> str:
+        """Find devices present in tower dump but silent in CDR/IPDR"""
         
-        # Collect devices with IPDR activity
-        ipdr_devices = set()
-        ipdr_activity = {}
+        buf = io.StringIO()
+        buf.write("🔇 SILENT DEVICE DETECTION\n")
+        buf.write("=" * 80 + "\n")
         
-        if self.ipdr_data:
-            for suspect, ipdr_df in self.ipdr_data.items():
-                # Extract phone number from suspect name or IPDR data
-                if 'subscriber_id' in ipdr_df.columns:
-                    numbers = ipdr_df['subscriber_id'].unique()
-                    ipdr_devices.update(numbers)
-                    
-                    # Track IPDR activity
-                    if 'start_time' in ipdr_df.columns:
-                        for number in numbers:
-                            if number not in ipdr_activity:
-                                ipdr_activity[number] = []
-                            
-                            number_ipdr = ipdr_df[ipdr_df['subscriber_id'] == number]
-                            ipdr_activity[number].append({
-                                'start': number_ipdr['start_time'].min(),
-                                'end': number_ipdr['start_time'].max(),
-                                'session_count': len(number_ipdr)
-                            })
+        book = self._id_codebook()
         
-        # Find silent devices
-        completely_silent = tower_devices - cdr_devices - ipdr_devices
-        cdr_silent = tower_devices - cdr_devices
-        ipdr_silent = tower_devices - ipdr_devices
-        
-        # Categorize silent devices
-        silent_categories = {
-            'completely_silent': [],
-            'cdr_only_silent': [],
-            'ipdr_only_silent': [],
-            'intermittent_silent': []
-        }
+        # Collect all devices from tower dump, with the time range of every
+        # device in each dump from one groupby; a missing number (-1) matches
+        # no record
+        tower_devices = book['devices']['tower']
+        spans = [
+            df['timestamp'].groupby(book['tower'][dump_id]).agg(['min', 'max', 'size']).drop(-1, errors='ignore')
+            for dump_id, df in self.tower_dump_data.items()
+            if 'mobile_number' in df.columns and 'timestamp' in df.columns
+        ]
         
-        # Analyze completely silent devices
-        for device in completely_silent:
-            if device in tower_device_times:
-                time_info = tower_device_times[device][0]  # First occurrence
-                silent_categories['completely_silent'].append({
-                    'device': device,
-                    'tower_records': sum(t['records'] for t in tower_device_times[device]),
-                    'first_seen': time_info['start'],
-                    'last_seen': time_info['end'],
-                    'duration_hours': (time_info['end'] - time_info['start']).total_seconds() / 3600
-                })
+        # Devices with CDR or IPDR activity
+        cdr_devices = book['devices']['cdr']
+        ipdr_devices = book['devices']['ipdr']
+        
+        # One row per timestamped tower device: records summed over the dumps,
+        # period from the first dump it appears in, and its CDR/IPDR presence
+        tower_agg = pd.DataFrame(columns=['start', 'end', 'records', 'in_cdr', 'in_ipdr', 'duration_hours'])
+        if spans:
+            all_spans = pd.concat(spans)
+            tower_agg = all_spans[~all_spans.index.duplicated()].rename(columns={'min': 'start', 'max': 'end'})
+            tower_agg['records'] = all_spans['size'].groupby(level=0).sum()
+            tower_agg = tower_agg.drop(columns='size').sort_index()
+            tower_agg['in_cdr'] = np.isin(tower_agg.index, cdr_devices)
+            tower_agg['in_ipdr'] = np.isin(tower_agg.index, ipdr_devices)
+            tower_agg['duration_hours'] = (tower_agg['end'] - tower_agg['start']).dt.total_seconds() / 3600
+        
+        # Completely silent devices: present in the area, no calls or data usage
+        completely_silent = tower_agg[~tower_agg['in_cdr'] & ~tower_agg['in_ipdr']]
         
         # Report findings
-        if silent_categories['completely_silent']:
-            results.append(f"\n🔴 COMPLETELY SILENT DEVICES: {len(silent_categories['completely_silent'])}")
-            results.append("   ⚠️ Present in area but no calls or data usage")
-            
-            # Sort by tower records
-            sorted_silent = sorted(
-                silent_categories['completely_silent'],
-                key=lambda x: x['tower_records'],
-                reverse=True
-            )
-            
-            for device_info in sorted_silent[:5]:
-                results.append(f"\n📱 {device_info['device']}")
-                results.append(f"   Tower Records: {device_info['tower_records']}")
-                results.append(f"   Duration: {device_info['duration_hours']:.1f} hours")
-                results.append(f"   Period: {device_info['first_seen']} to {device_info['last_seen']}")
+        if len(completely_silent):
+            buf.write(f"\n🔴 COMPLETELY SILENT DEVICES: {len(completely_silent)}\n")
+            buf.write("   ⚠️ Present in area but no calls or data usage\n")
+            
+            # Top devices by tower records (ties keep code order): a partition
+            # finds the fifth-highest count, so only devices at or above it are sorted
+            silent_records = completely_silent['records'].to_numpy()
+            kth = len(silent_records) - min(5, len(silent_records))
+            candidates = np.flatnonzero(silent_records >= np.partition(silent_records, kth)[kth])
+            top = candidates[np.argsort(-silent_records[candidates], kind='stable')][:5]
+            for device, device_info in completely_silent.iloc[top].iterrows():
+                buf.write(f"\n📱 {book['numbers'][device]}\n")
+                buf.write(f"   Tower Records: {device_info['records']}\n")
+                buf.write(f"   Duration: {device_info['duration_hours']:.1f} hours\n")
+                buf.write(f"   Period: {device_info['start']} to {device_info['end']}\n")
         
         # CDR-only silent (has IPDR but no calls)
-        data_only_devices = ipdr_devices - cdr_devices
-        if data_only_devices & tower_devices:
-            results.append(f"\n🟡 DATA-ONLY DEVICES: {len(data_only_devices & tower_devices)}")
-            results.append("   📱 Using data but making no calls")
-            results.append("   ⚠️ May indicate encrypted app communication")
+        data_only_devices = np.intersect1d(
+            np.setdiff1d(ipdr_devices, cdr_devices, assume_unique=True), tower_devices, assume_unique=True
+        )
+        if len(data_only_devices):
+            buf.write(f"\n🟡 DATA-ONLY DEVICES: {len(data_only_devices)}\n")
+            buf.write("   📱 Using data but making no calls\n")
+            buf.write("   ⚠️ May indicate encrypted app communication\n")
         
         # Voice-only devices (has CDR but no IPDR)
-        voice_only_devices = cdr_devices - ipdr_devices
-        if voice_only_devices & tower_devices:
-            results.append(f"\n🟡 VOICE-ONLY DEVICES: {len(voice_only_devices & tower_devices)}")
-            results.append("   📞 Making calls but no data usage")
-            results.append("   ⚠️ May indicate operational security behavior")
+        voice_only_devices = np.intersect1d(
+            np.setdiff1d(cdr_devices, ipdr_devices, assume_unique=True), tower_devices, assume_unique=True
+        )
+        if len(voice_only_devices):
+            buf.write(f"\n🟡 VOICE-ONLY DEVICES: {len(voice_only_devices)}\n")
+            buf.write("   📞 Making calls but no data usage\n")
+            buf.write("   ⚠️ May indicate operational security behavior\n")
         
         # Suspicious silent patterns
-        results.append("\n🎯 SILENT DEVICE PATTERNS:")
+        buf.write("\n🎯 SILENT DEVICE PATTERNS:\n")
         
         # Brief silent presence
-        brief_silent = [
-            d for d in silent_categories['completely_silent']
-            if d['duration_hours'] < 1 and d['tower_records'] < 5
-        ]
+        brief_silent = int(np.sum(
+            (completely_silent['duration_hours'].to_numpy(dtype=float) < 1) & (completely_silent['records'].to_numpy(dtype=float) < 5)
+        ))
         
         if brief_silent:
-            results.append(f"\n  • Brief Silent Presence: {len(brief_silent)} devices")
-            results.append("    Appeared briefly with no communication")
-            results.append("    ⚠️ Possible surveillance or reconnaissance")
+            buf.write(f"\n  • Brief Silent Presence: {brief_silent} devices\n")
+            buf.write("    Appeared briefly with no communication\n")
+            buf.write("    ⚠️ Possible surveillance or reconnaissance\n")
         
-        return "\n".join(results)
+        return buf.getvalue()
     
     def _link_tower_cdr(self) -> str:
         """Link tower dump presence with CDR activity"""
         
-        results = []
-        results.append("🔗 TOWER-CDR LINKAGE ANALYSIS")
-        results.append("=" * 80)
+        buf = io.StringIO()
+        buf.write("🔗 TOWER-CDR LINKAGE ANALYSIS\n")
+        buf.write("=" * 80 + "\n")
         
-        linked_activities = []
+        # Join each (dump, suspect) pair of the framed dumps and CDRs in one
+        # vectorized pass instead of per-record mask scans
+        tower_frames, cdr_frames = self._derived('_link_frames')
         
-        # For each device in tower dump
-        for dump_id, tower_df in self.tower_dump_data.items():
-            if not all(col in tower_df.columns for col in ['mobile_number', 'timestamp', 'tower_id']):
-                continue
-            
-            # Check against CDR data
-            for suspect, cdr_df in self.cdr_data.items():
-                if not all(col in cdr_df.columns for col in ['a_party', 'datetime']):
-                    continue
-                
-                # Find matching numbers
-                tower_numbers = set(tower_df['mobile_number'].unique())
-                cdr_numbers = set(cdr_df['a_party'].unique())
-                
-                common_numbers = tower_numbers & cdr_numbers
-                
-                for number in common_numbers:
-                    # Get tower presence times
-                    tower_presence = tower_df[tower_df['mobile_number'] == number]
-                    
-                    # Get CDR activity
-                    cdr_activity = cdr_df[cdr_df['a_party'] == number]
-                    
-                    # Find temporal correlations
-                    for _, tower_record in tower_presence.iterrows():
-                        tower_time = tower_record['timestamp']
-                        tower_id = tower_record['tower_id']
-                        
-                        # Find CDRs within time window
-                        time_window_start = tower_time - timedelta(minutes=self.params['time_tolerance_minutes'])
-                        time_window_end = tower_time + timedelta(minutes=self.params['time_tolerance_minutes'])
-                        
-                        matching_cdrs = cdr_activity[
-                            (cdr_activity['datetime'] >= time_window_start) &
-                            (cdr_activity['datetime'] <= time_window_end)
-                        ]
-                        
-                        if len(matching_cdrs) > 0:
-                            for _, cdr in matching_cdrs.iterrows():
-                                linked_activities.append({
-                                    'number': number,
-                                    'tower_id': tower_id,
-                                    'tower_time': tower_time,
-                                    'cdr_time': cdr['datetime'],
-                                    'b_party': cdr.get('b_party', 'Unknown'),
-                                    'duration': cdr.get('duration', 0),
-                                    'time_diff': abs((cdr['datetime'] - tower_time).total_seconds()),
-                                    'call_type': cdr.get('call_type', 'voice')
-                                })
+        # Pairs run in (dump, suspect) order, so their links concatenate in order
+        tol_ns = np.int64(self.params['time_tolerance_minutes'] * 60) * np.int64(10**9)
+        tasks = [(tower, cdr, 'tower_time', 'cdr_time', tol_ns) for tower in tower_frames for cdr in cdr_frames]
+        linked = pd.concat(_run_pairs(_link_by_time, tasks), ignore_index=True) if tasks else pd.DataFrame()
         
         # Analyze linked activities
-        if linked_activities:
-            results.append(f"\n📊 LINKED ACTIVITIES FOUND: {len(linked_activities)}")
-            
-            # Group by number
-            number_links = defaultdict(list)
-            for link in linked_activities:
-                number_links[link['number']].append(link)
+        if len(linked):
+            buf.write(f"\n📊 LINKED ACTIVITIES FOUND: {len(linked)}\n")
+            
+            # Per-number aggregates in order of each number's first link
+            by_number = linked.groupby('number_code', sort=False)
+            known_contacts = linked[linked['b_party'] != 'Unknown']
+            summary = pd.DataFrame({
+                'links': by_number.size(),
+                'towers': by_number['tower_id'].nunique(dropna=False),
+                'contacts': known_contacts.groupby('number_code', sort=False)['b_party'].nunique(dropna=False),
+            }).fillna({'contacts': 0}).astype({'contacts': int})
+            samples = linked.drop_duplicates('number_code').set_index('number_code')
             
             # Sort by link count
-            sorted_numbers = sorted(
-                number_links.items(),
-                key=lambda x: len(x[1]),
-                reverse=True
-            )
+            top_numbers = summary.sort_values('links', ascending=False, kind='stable').head(5)
             
-            results.append("\n🔗 DEVICES WITH TOWER-CDR CORRELATION:")
+            buf.write("\n🔗 DEVICES WITH TOWER-CDR CORRELATION:\n")
             
-            for number, links in sorted_numbers[:5]:
-                results.append(f"\n📱 {number}")
-                results.append(f"   Correlated Activities: {len(links)}")
-                
-                # Analyze patterns
-                towers_used = set(l['tower_id'] for l in links)
-                contacts = set(l['b_party'] for l in links if l['b_party'] != 'Unknown')
-                
-                results.append(f"   Towers Used: {len(towers_used)}")
-                results.append(f"   Unique Contacts: {len(contacts)}")
+            for code, stats in top_numbers.iterrows():
+                sample = samples.loc[code]
+                buf.write(f"\n📱 {sample['mobile_number']}\n")
+                buf.write(f"   Correlated Activities: {stats['links']}\n")
+                buf.write(f"   Towers Used: {stats['towers']}\n")
+                buf.write(f"   Unique Contacts: {stats['contacts']}\n")
                 
                 # Show sample activity
-                sample = links[0]
-                results.append(f"   Sample Link:")
-                results.append(f"     Tower: {sample['tower_id']} at {sample['tower_time']}")
-                results.append(f"     Call to {sample['b_party']} at {sample['cdr_time']}")
-                results.append(f"     Duration: {sample['duration']}s")
+                buf.write(f"   Sample Link:\n")
+                buf.write(f"     Tower: {sample['tower_id']} at {sample['tower_time']}\n")
+                buf.write(f"     Call to {sample['b_party']} at {sample['cdr_time']}\n")
+                buf.write(f"     Duration: {sample['duration']}s\n")
         
         # Find calls without tower presence
-        results.append("\n🚨 ANOMALOUS PATTERNS:")
-        
-        # CDR activity without tower dump presence
-        ghost_calls = []
+        buf.write("\n🚨 ANOMALOUS PATTERNS:\n")
         
-        for suspect, cdr_df in self.cdr_data.items():
-            if 'a_party' not in cdr_df.columns:
-                continue
-            
-            for number in cdr_df['a_party'].unique():
-                # Check if number appears in tower dump
-                appears_in_tower = False
-                
-                for dump_id, tower_df in self.tower_dump_data.items():
-                    if 'mobile_number' in tower_df.columns:
-                        if number in tower_df['mobile_number'].values:
-                            appears_in_tower = True
-                            break
-                
-                if not appears_in_tower:
-                    ghost_calls.append({
-                        'number': number,
-                        'call_count': len(cdr_df[cdr_df['a_party'] == number])
-                    })
+        # CDR activity without tower dump presence: each CDR's distinct numbers
+        # that no dump contains
+        book = self._id_codebook()
+        ghost_calls = sum(len(np.setdiff1d(codes, book['devices']['tower'])) for codes in book['cdr'].values())
         
         if ghost_calls:
-            results.append(f"\n  • Ghost Calls: {len(ghost_calls)} numbers")
-            results.append("    Made calls but not in tower dump")
-            results.append("    ⚠️ Possible data inconsistency or advanced evasion")
+            buf.write(f"\n  • Ghost Calls: {ghost_calls} numbers\n")
+            buf.write("    Made calls but not in tower dump\n")
+            buf.write("    ⚠️ Possible data inconsistency or advanced evasion\n")
         
-        return "\n".join(results)
+        return buf.getvalue()
     
     def _link_tower_ipdr(self) -> str:
         """Link tower dump presence with IPDR activity"""
         
-        results = []
-        results.append("🔗 TOWER-IPDR LINKAGE ANALYSIS")
-        results.append("=" * 80)
+        buf = io.StringIO()
+        buf.write("🔗 TOWER-IPDR LINKAGE ANALYSIS\n")
+        buf.write("=" * 80 + "\n")
         
-        linked_sessions = []
+        # Link the framed dumps to the framed IPDR sessions with the same
+        # kernel, and the same sorted tower frames, as the CDR linkage
+        tower_frames, _ = self._derived('_link_frames')
+        session_frames = self._derived('_session_frames')
         
-        # For each device in tower dump
-        for dump_id, tower_df in self.tower_dump_data.items():
-            if not all(col in tower_df.columns for col in ['mobile_number', 'timestamp', 'tower_id']):
-                continue
-            
-            # Check against IPDR data
-            for suspect, ipdr_df in self.ipdr_data.items():
-                # Try to extract phone number from IPDR
-                if 'subscriber_id' in ipdr_df.columns:
-                    ipdr_numbers = set(ipdr_df['subscriber_id'].unique())
-                else:
-                    # Extract from suspect name if possible
-                    import re
-                    match = re.search(r'\d{10}', suspect)
-                    if match:
-                        ipdr_numbers = {match.group()}
-                    else:
-                        continue
-                
-                # Find matching numbers
-                tower_numbers = set(tower_df['mobile_number'].unique())
-                common_numbers = tower_numbers & ipdr_numbers
-                
-                for number in common_numbers:
-                    # Get tower presence
-                    tower_presence = tower_df[tower_df['mobile_number'] == number]
-                    
-                    # Get IPDR sessions
-                    if 'subscriber_id' in ipdr_df.columns:
-                        ipdr_sessions = ipdr_df[ipdr_df['subscriber_id'] == number]
-                    else:
-                        ipdr_sessions = ipdr_df  # All sessions for this suspect
-                    
-                    # Find temporal correlations
-                    for _, tower_record in tower_presence.iterrows():
-                        tower_time = tower_record['timestamp']
-                        tower_id = tower_record['tower_id']
-                        
-                        # Find IPDR sessions within window
-                        if 'start_time' in ipdr_sessions.columns:
-                            time_window_start = tower_time - timedelta(minutes=self.params['time_tolerance_minutes'])
-                            time_window_end = tower_time + timedelta(minutes=self.params['time_tolerance_minutes'])
-                            
-                            matching_sessions = ipdr_sessions[
-                                (ipdr_sessions['start_time'] >= time_window_start) &
-                                (ipdr_sessions['start_time'] <= time_window_end)
-                            ]
-                            
-                            for _, session in matching_sessions.iterrows():
-                                linked_sessions.append({
-                                    'number': number,
-                                    'tower_id': tower_id,
-                                    'tower_time': tower_time,
-                                    'session_start': session['start_time'],
-                                    'app': session.get('detected_app', 'Unknown'),
-                                    'encrypted': session.get('is_encrypted', False),
-                                    'data_volume': session.get('total_data_volume', 0),
-                                    'time_diff': abs((session['start_time'] - tower_time).total_seconds())
-                                })
+        # Pairs run in (dump, suspect) order, so their sessions concatenate in order
+        tol_ns = np.int64(self.params['time_tolerance_minutes'] * 60) * np.int64(10**9)
+        tasks = [
+            (tower, sessions, 'tower_time', 'session_start', tol_ns)
+            for tower in tower_frames for sessions in session_frames
+        ]
+        linked_df = pd.concat(
+            [pd.DataFrame(columns=_SESSION_COLUMNS)] + _run_pairs(_link_by_time, tasks),
+            ignore_index=True
+        )
+        linked_df['data_volume'] = pd.to_numeric(linked_df['data_volume'])
         
         # Analyze linked sessions
-        if linked_sessions:
-            results.append(f"\n📊 LINKED DATA SESSIONS: {len(linked_sessions)}")
+        if len(linked_df):
+            buf.write(f"\n📊 LINKED DATA SESSIONS: {len(linked_df)}\n")
             
             # Encrypted app usage at towers
-            encrypted_sessions = [s for s in linked_sessions if s['encrypted']]
+            encrypted_df = linked_df[linked_df['encrypted'].astype(bool)]
             
-            if encrypted_sessions:
-                results.append(f"\n🔐 ENCRYPTED APP USAGE AT TOWERS: {len(encrypted_sessions)}")
+            if len(encrypted_df):
+                buf.write(f"\n🔐 ENCRYPTED APP USAGE AT TOWERS: {len(encrypted_df)}\n")
                 
-                # Group by app
-                app_usage = defaultdict(list)
-                for session in encrypted_sessions:
-                    app_usage[session['app']].append(session)
+                # Group by app, showing the towers where each app was used in
+                # order of first use
+                app_report = encrypted_df.groupby('app', sort=False, dropna=False).agg(
+                    n=('tower_id', 'size'),
+                    towers=('tower_id', lambda s: list(pd.unique(s))[:5])
+                )
                 
-                for app, sessions in app_usage.items():
-                    results.append(f"\n   {app}: {len(sessions)} sessions")
-                    
-                    # Show towers where app was used
-                    app_towers = set(s['tower_id'] for s in sessions)
-                    results.append(f"   Towers: {', '.join(list(app_towers)[:5])}")
+                for app, usage in app_report.iterrows():
+                    buf.write(f"\n   {app}: {usage['n']} sessions\n")
+                    buf.write(f"   Towers: {', '.join(usage['towers'])}\n")
             
             # High data usage at specific towers
-            high_data_sessions = [
-                s for s in linked_sessions 
-                if s['data_volume'] > 10 * 1024 * 1024  # 10MB
-            ]
+            high_data_df = linked_df[linked_df['data_volume'] > 10 * 1024 * 1024]  # 10MB
             
-            if high_data_sessions:
-                results.append(f"\n📊 HIGH DATA USAGE LOCATIONS: {len(high_data_sessions)}")
-                
-                # Group by tower
-                tower_data = defaultdict(float)
-                for session in high_data_sessions:
-                    tower_data[session['tower_id']] += session['data_volume']
+            if len(high_data_df):
+                buf.write(f"\n📊 HIGH DATA USAGE LOCATIONS: {len(high_data_df)}\n")
                 
-                # Sort by data volume
-                sorted_towers = sorted(
-                    tower_data.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )
+                # Group by tower, largest volume first
+                tower_data = high_data_df.groupby('tower_id', sort=False)['data_volume'].sum().nlargest(3)
                 
-                for tower, volume in sorted_towers[:3]:
-                    results.append(f"   Tower {tower}: {volume / (1024*1024):.1f} MB total")
+                for tower, volume in tower_data.items():
+                    buf.write(f"   Tower {tower}: {volume / (1024*1024):.1f} MB total\n")
         
         # Silent data patterns
-        results.append("\n🎯 DATA BEHAVIOR PATTERNS:")
+        buf.write("\n🎯 DATA BEHAVIOR PATTERNS:\n")
         
-        # Devices with IPDR but no tower presence during sessions
-        phantom_data = []
+        # Devices with IPDR but no tower presence during sessions: every tower
+        # record time, sorted once, answers each session's window with one
+        # binary search (the first record at or after the window start must
+        # not be past its end)
+        window_ns = np.int64(5 * 60) * np.int64(10**9)
+        tower_times = self._derived('_tower_times')
         
+        phantom_data = 0
         for suspect, ipdr_df in self.ipdr_data.items():
-            if 'start_time' not in ipdr_df.columns:
+            if 'start_time' not in ipdr_df.columns or 'is_encrypted' not in ipdr_df.columns:
                 continue
             
-            # Check each session
-            for _, session in ipdr_df.iterrows():
-                session_time = session['start_time']
-                
-                # Check if device was in tower dump around this time
-                found_in_tower = False
-                
-                for dump_id, tower_df in self.tower_dump_data.items():
-                    if 'timestamp' in tower_df.columns:
-                        time_matches = tower_df[
-                            (tower_df['timestamp'] >= session_time - timedelta(minutes=5)) &
-                            (tower_df['timestamp'] <= session_time + timedelta(minutes=5))
-                        ]
-                        
-                        if len(time_matches) > 0:
-                            found_in_tower = True
-                            break
-                
-                if not found_in_tower and session.get('is_encrypted', False):
-                    phantom_data.append({
-                        'time': session_time,
-                        'app': session.get('detected_app', 'Unknown'),
-                        'volume': session.get('total_data_volume', 0)
-                    })
+            session_times = ipdr_df['start_time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            first_after = np.searchsorted(tower_times, session_times - window_ns, side='left')
+            found_in_tower = np.zeros(len(session_times), dtype=bool)
+            inside = first_after < len(tower_times)
+            found_in_tower[inside] = tower_times[first_after[inside]] <= session_times[inside] + window_ns
+            found_in_tower &= session_times != np.iinfo(np.int64).min
+            
+            phantom_data += int((~found_in_tower & ipdr_df['is_encrypted'].to_numpy().astype(bool)).sum())
         
         if phantom_data:
-            results.append(f"\n  • Phantom Data Sessions: {len(phantom_data)}")
-            results.append("    Encrypted data without tower presence")
-            results.append("    ⚠️ May indicate VPN usage or data inconsistency")
+            buf.write(f"\n  • Phantom Data Sessions: {phantom_data}\n")
+            buf.write("    Encrypted data without tower presence\n")
+            buf.write("    ⚠️ May indicate VPN usage or data inconsistency\n")
         
-        return "\n".join(results)
+        return buf.getvalue()
     
     def _build_suspect_profiles(self) -> str:
         """Build comprehensive suspect profiles combining all data sources"""
         
-        results = []
-        results.append("👤 COMPREHENSIVE SUSPECT PROFILES")
-        results.append("=" * 80)
+        buf = io.StringIO()
+        buf.write("👤 COMPREHENSIVE SUSPECT PROFILES\n")
+        buf.write("=" * 80 + "\n")
         
-        # Build profiles for devices appearing in multiple data sources
-        suspect_profiles = {}
+        # Collect all unique numbers from the tower dumps and CDRs; a missing
+        # number (-1) matches no record, so it never gets a profile
+        book = self._id_codebook()
+        all_numbers = np.union1d(book['devices']['tower'], book['devices']['cdr'])
+        all_numbers = all_numbers[all_numbers >= 0]
         
-        # Collect all unique numbers from all sources
-        all_numbers = set()
-        
-        # From tower dump
-        for dump_id, df in self.tower_dump_data.items():
-            if 'mobile_number' in df.columns:
-                all_numbers.update(df['mobile_number'].unique())
-        
-        # From CDR
-        for suspect, df in self.cdr_data.items():
-            if 'a_party' in df.columns:
-                all_numbers.update(df['a_party'].unique())
-        
-        # Build profile for each number
-        for number in all_numbers:
-            profile = {
-                'number': number,
-                'tower_dump': {},
-                'cdr': {},
-                'ipdr': {},
-                'risk_indicators': [],
-                'timeline': []
-            }
-            
-            # Tower dump analysis
-            for dump_id, tower_df in self.tower_dump_data.items():
-                if 'mobile_number' in tower_df.columns:
-                    device_data = tower_df[tower_df['mobile_number'] == number]
-                    
-                    if len(device_data) > 0:
-                        profile['tower_dump'] = {
-                            'presence_count': len(device_data),
-                            'unique_towers': device_data['tower_id'].nunique() if 'tower_id' in device_data.columns else 0,
-                            'first_seen': device_data['timestamp'].min() if 'timestamp' in device_data.columns else None,
-                            'last_seen': device_data['timestamp'].max() if 'timestamp' in device_data.columns else None,
-                            'unique_imeis': device_data['imei'].nunique() if 'imei' in device_data.columns else 0
-                        }
-                        
-                        # Add to timeline
-                        if 'timestamp' in device_data.columns:
-                            for _, record in device_data.iterrows():
-                                profile['timeline'].append({
-                                    'time': record['timestamp'],
-                                    'type': 'tower',
-                                    'details': f"Tower {record.get('tower_id', 'Unknown')}"
-                                })
-            
-            # CDR analysis
-            for suspect, cdr_df in self.cdr_data.items():
-                if 'a_party' in cdr_df.columns:
-                    call_data = cdr_df[cdr_df['a_party'] == number]
-                    
-                    if len(call_data) > 0:
-                        profile['cdr'] = {
-                            'total_calls': len(call_data),
-                            'unique_contacts': call_data['b_party'].nunique() if 'b_party' in call_data.columns else 0,
-                            'total_duration': call_data['duration'].sum() if 'duration' in call_data.columns else 0,
-                            'odd_hour_calls': len(call_data[call_data['datetime'].dt.hour.between(0, 5)]) if 'datetime' in call_data.columns else 0
-                        }
-                        
-                        # Add to timeline
-                        if 'datetime' in call_data.columns:
-                            for _, call in call_data.iterrows():
-                                profile['timeline'].append({
-                                    'time': call['datetime'],
-                                    'type': 'call',
-                                    'details': f"Call to {call.get('b_party', 'Unknown')}"
-                                })
-            
-            # Assess risk indicators
-            if profile['tower_dump']:
-                # Multiple IMEIs
-                if profile['tower_dump'].get('unique_imeis', 0) > 1:
-                    profile['risk_indicators'].append('Multiple IMEIs detected')
-                
-                # Brief presence
-                if profile['tower_dump'].get('presence_count', 0) == 1:
-                    profile['risk_indicators'].append('One-time visitor')
-            
-            if profile['cdr']:
-                # Odd hour activity
-                if profile['cdr'].get('odd_hour_calls', 0) > 0:
-                    profile['risk_indicators'].append('Odd-hour calling activity')
-                
-                # High call volume
-                if profile['cdr'].get('total_calls', 0) > 50:
-                    profile['risk_indicators'].append('High call volume')
-            
-            # Silent device
-            if profile['tower_dump'] and not profile['cdr']:
-                profile['risk_indicators'].append('Silent device (no calls)')
-            
-            # Store profile if has any data
-            if profile['tower_dump'] or profile['cdr'] or profile['ipdr']:
-                suspect_profiles[number] = profile
+        # Per-number statistics of each dump and CDR from one groupby per frame
+        tower_stats = []
+        for dump_id, tower_df in self.tower_dump_data.items():
+            if 'mobile_number' in tower_df.columns:
+                codes = book['tower'][dump_id]
+                groups = tower_df.groupby(codes)
+                stats = pd.DataFrame({'presence_count': groups.size()})
+                # Distinct counts run over category codes rather than strings
+                stats['unique_towers'] = self._categorical('tower', dump_id, 'tower_id').groupby(codes).nunique() if 'tower_id' in tower_df.columns else 0
+                stats['first_seen'] = groups['timestamp'].min() if 'timestamp' in tower_df.columns else None
+                stats['last_seen'] = groups['timestamp'].max() if 'timestamp' in tower_df.columns else None
+                stats['unique_imeis'] = self._categorical('tower', dump_id, 'imei').groupby(codes).nunique() if 'imei' in tower_df.columns else 0
+                tower_stats.append(stats)
+        
+        cdr_stats = []
+        for suspect, cdr_df in self.cdr_data.items():
+            if 'a_party' in cdr_df.columns:
+                codes = book['cdr'][suspect]
+                groups = cdr_df.groupby(codes)
+                stats = pd.DataFrame({'total_calls': groups.size()})
+                stats['unique_contacts'] = self._categorical('cdr', suspect, 'b_party').groupby(codes).nunique() if 'b_party' in cdr_df.columns else 0
+                stats['total_duration'] = groups['duration'].sum() if 'duration' in cdr_df.columns else 0
+                # Odd hours are flagged once per CDR, then summed in the same grouping
+                stats['odd_hour_calls'] = cdr_df['datetime'].dt.hour.between(0, 5).groupby(codes).sum() if 'datetime' in cdr_df.columns else 0
+                cdr_stats.append(stats)
+        
+        # One summary row per number; a later dump or CDR overrides the summary
+        tower_summary = pd.concat(tower_stats) if tower_stats else pd.DataFrame(columns=['presence_count', 'unique_towers', 'unique_imeis'], dtype=int)
+        tower_summary = tower_summary[~tower_summary.index.duplicated(keep='last')]
+        cdr_summary = pd.concat(cdr_stats) if cdr_stats else pd.DataFrame(columns=['total_calls', 'unique_contacts', 'odd_hour_calls'], dtype=int)
+        cdr_summary = cdr_summary[~cdr_summary.index.duplicated(keep='last')]
+        
+        # Risk indicators as one boolean column each, in reporting order
+        in_tower = np.isin(all_numbers, tower_summary.index)
+        in_cdr = np.isin(all_numbers, cdr_summary.index)
+        indicators = pd.DataFrame({
+            'Multiple IMEIs detected': tower_summary['unique_imeis'].reindex(all_numbers, fill_value=0).to_numpy() > 1,
+            'One-time visitor': tower_summary['presence_count'].reindex(all_numbers, fill_value=0).to_numpy() == 1,
+            'Odd-hour calling activity': cdr_summary['odd_hour_calls'].reindex(all_numbers, fill_value=0).to_numpy() > 0,
+            'High call volume': cdr_summary['total_calls'].reindex(all_numbers, fill_value=0).to_numpy() > 50,
+            'Silent device (no calls)': in_tower & ~in_cdr,
+        }, index=all_numbers)
+        
+        # Profiles exist for numbers with any data, ranked by indicator count
+        # (ties keep code order)
+        profiled = indicators[in_tower | in_cdr]
+        risk_counts = profiled.sum(axis=1)
+        ranked = risk_counts.iloc[np.argsort(-risk_counts.to_numpy(), kind='stable')]
         
         # Report top suspect profiles
-        if suspect_profiles:
-            # Sort by risk indicators
-            sorted_profiles = sorted(
-                suspect_profiles.items(),
-                key=lambda x: len(x[1]['risk_indicators']),
-                reverse=True
-            )
-            
-            results.append(f"\n📊 SUSPECT PROFILES GENERATED: {len(suspect_profiles)}")
+        if len(profiled):
+            buf.write(f"\n📊 SUSPECT PROFILES GENERATED: {len(profiled)}\n")
             
             # High-risk profiles
-            high_risk = [(n, p) for n, p in sorted_profiles if len(p['risk_indicators']) >= 2]
+            high_risk = ranked[ranked >= 2]
             
-            if high_risk:
-                results.append(f"\n🔴 HIGH-RISK PROFILES ({len(high_risk)}):")
+            if len(high_risk):
+                buf.write(f"\n🔴 HIGH-RISK PROFILES ({len(high_risk)}):\n")
                 
-                for number, profile in high_risk[:5]:
-                    results.append(f"\n📱 {number}")
+                # Profiles are assembled only for the reported numbers
+                for code in high_risk.index[:5]:
+                    profile = {
+                        'number': book['numbers'][code],
+                        'tower_dump': tower_summary.loc[code] if code in tower_summary.index else None,
+                        'cdr': cdr_summary.loc[code] if code in cdr_summary.index else None,
+                        'risk_indicators': list(profiled.columns[profiled.loc[code].to_numpy()])
+                    }
+                    buf.write(f"\n📱 {profile['number']}\n")
                     
                     # Tower dump summary
-                    if profile['tower_dump']:
+                    if profile['tower_dump'] is not None:
                         td = profile['tower_dump']
-                        results.append(f"   Tower Presence: {td['presence_count']} records at {td['unique_towers']} towers")
+                        buf.write(f"   Tower Presence: {td['presence_count']} records at {td['unique_towers']} towers\n")
                     
                     # CDR summary
-                    if profile['cdr']:
+                    if profile['cdr'] is not None:
                         cdr = profile['cdr']
-                        results.append(f"   Call Activity: {cdr['total_calls']} calls to {cdr['unique_contacts']} contacts")
+                        buf.write(f"   Call Activity: {cdr['total_calls']} calls to {cdr['unique_contacts']} contacts\n")
                     
                     # Risk indicators
-                    results.append(f"   Risk Indicators:")
+                    buf.write(f"   Risk Indicators:\n")
                     for indicator in profile['risk_indicators']:
-                        results.append(f"     ⚠️ {indicator}")
+                        buf.write(f"     ⚠️ {indicator}\n")
         
-        return "\n".join(results)
+        return buf.getvalue()
     
     def _analyze_crime_scene_communications(self) -> str:
         """Analyze communications at crime scene locations"""
         
-        results = []
-        results.append("🔍 CRIME SCENE COMMUNICATION ANALYSIS")
-        results.append("=" * 80)
+        buf = io.StringIO()
+        buf.write("🔍 CRIME SCENE COMMUNICATION ANALYSIS\n")
+        buf.write("=" * 80 + "\n")
         
         # Identify high-activity towers as potential crime scenes
         tower_activity = {}
@@ -675,7 +656,7 @@ class CrossReferenceTool(BaseTool):
         )[:3]
         
         for tower_id, _ in crime_scene_towers:
-            results.append(f"\n📍 CRIME SCENE: Tower {tower_id}")
+            buf.write(f"\n📍 CRIME SCENE: Tower {tower_id}\n")
             
             # Get all devices at this tower
             devices_at_scene = set()
@@ -683,7 +664,7 @@ class CrossReferenceTool(BaseTool):
             
             for dump_id, tower_df in self.tower_dump_data.items():
                 if 'tower_id' in tower_df.columns:
-                    scene_data = tower_df[tower_df['tower_id'] == tower_id]
+                    scene_data = tower_df[self._categorical('tower', dump_id, 'tower_id') == tower_id]
                     
                     if 'mobile_number' in scene_data.columns:
                         devices_at_scene.update(scene_data['mobile_number'].unique())
@@ -697,7 +678,7 @@ class CrossReferenceTool(BaseTool):
                                 'type': 'presence'
                             })
             
-            results.append(f"   Devices Present: {len(devices_at_scene)}")
+            buf.write(f"   Devices Present: {len(devices_at_scene)}\n")
             
             # Check CDR activity for devices at scene
             calls_at_scene = []
@@ -705,7 +686,7 @@ class CrossReferenceTool(BaseTool):
             for device in devices_at_scene:
                 for suspect, cdr_df in self.cdr_data.items():
                     if 'a_party' in cdr_df.columns:
-                        device_calls = cdr_df[cdr_df['a_party'] == device]
+                        device_calls = cdr_df[self._categorical('cdr', suspect, 'a_party') == device]
                         
                         if len(device_calls) > 0:
                             calls_at_scene.append({
@@ -715,11 +696,11 @@ class CrossReferenceTool(BaseTool):
                             })
             
             if calls_at_scene:
-                results.append(f"\n   📞 COMMUNICATION ACTIVITY:")
+                buf.write(f"\n   📞 COMMUNICATION ACTIVITY:\n")
                 
                 # Devices making calls
                 active_callers = [c for c in calls_at_scene if c['call_count'] > 0]
-                results.append(f"   Active Callers: {len(active_callers)}")
+                buf.write(f"   Active Callers: {len(active_callers)}\n")
                 
                 # Check for inter-device calls
                 all_devices = set(devices_at_scene)
@@ -734,21 +715,22 @@ class CrossReferenceTool(BaseTool):
                         })
                 
                 if inter_device_calls:
-                    results.append(f"\n   🔗 INTER-DEVICE COMMUNICATION DETECTED:")
+                    buf.write(f"\n   🔗 INTER-DEVICE COMMUNICATION DETECTED:\n")
                     for comm in inter_device_calls[:3]:
-                        results.append(f"      {comm['from']} → {', '.join(comm['to'])}")
+                        buf.write(f"      {comm['from']} → {', '.join(comm['to'])}\n")
         
-        return "\n".join(results)
+        return buf.getvalue()
     
     def _find_communication_patterns(self) -> str:
         """Find patterns in communication correlated with tower presence"""
         
-        results = []
-        results.append("📊 COMMUNICATION PATTERN ANALYSIS")
-        results.append("=" * 80)
+        buf = io.StringIO()
+        buf.write("📊 COMMUNICATION PATTERN ANALYSIS\n")
+        buf.write("=" * 80 + "\n")
         
         # Pattern 1: Calls immediately after tower appearance
         post_arrival_calls = []
+        post_arrival_window = pd.Timedelta(minutes=10)
         
         for dump_id, tower_df in self.tower_dump_data.items():
             if not all(col in tower_df.columns for col in ['mobile_number', 'timestamp', 'tower_id']):
@@ -773,7 +755,7 @@ class CrossReferenceTool(BaseTool):
                         # Calls within 10 minutes of arrival
                         post_arrival = device_calls[
                             (device_calls['datetime'] >= first_arrival['timestamp']) &
-                            (device_calls['datetime'] <= first_arrival['timestamp'] + timedelta(minutes=10))
+                            (device_calls['datetime'] <= first_arrival['timestamp'] + post_arrival_window)
                         ]
                         
                         if len(post_arrival) > 0:
@@ -786,14 +768,14 @@ class CrossReferenceTool(BaseTool):
                             })
         
         if post_arrival_calls:
-            results.append(f"\n📞 POST-ARRIVAL CALLING PATTERN: {len(post_arrival_calls)} instances")
-            results.append("   ⚠️ Calls immediately after arriving at location")
+            buf.write(f"\n📞 POST-ARRIVAL CALLING PATTERN: {len(post_arrival_calls)} instances\n")
+            buf.write("   ⚠️ Calls immediately after arriving at location\n")
             
             # Show examples
             for pattern in sorted(post_arrival_calls, key=lambda x: x['first_call_delay'])[:3]:
-                results.append(f"\n   📱 {pattern['device']}")
-                results.append(f"      Arrived at {pattern['tower']} at {pattern['arrival_time']}")
-                results.append(f"      Made {pattern['call_count']} calls within {pattern['first_call_delay']:.1f} minutes")
+                buf.write(f"\n   📱 {pattern['device']}\n")
+                buf.write(f"      Arrived at {pattern['tower']} at {pattern['arrival_time']}\n")
+                buf.write(f"      Made {pattern['call_count']} calls within {pattern['first_call_delay']:.1f} minutes\n")
         
         # Pattern 2: Silent periods at specific towers
         silent_towers = []
@@ -829,65 +811,56 @@ class CrossReferenceTool(BaseTool):
                 })
         
         if silent_towers:
-            results.append(f"\n🔇 SILENT ZONES DETECTED: {len(silent_towers)} towers")
-            results.append("   Areas where devices congregate but don't communicate")
+            buf.write(f"\n🔇 SILENT ZONES DETECTED: {len(silent_towers)} towers\n")
+            buf.write("   Areas where devices congregate but don't communicate\n")
             
             for zone in sorted(silent_towers, key=lambda x: x['silence_ratio'], reverse=True)[:3]:
-                results.append(f"\n   Tower {zone['tower']}:")
-                results.append(f"      {zone['silent_devices']}/{zone['total_devices']} devices silent")
-                results.append(f"      Silence ratio: {zone['silence_ratio']*100:.1f}%")
+                buf.write(f"\n   Tower {zone['tower']}:\n")
+                buf.write(f"      {zone['silent_devices']}/{zone['total_devices']} devices silent\n")
+                buf.write(f"      Silence ratio: {zone['silence_ratio']*100:.1f}%\n")
         
-        return "\n".join(results)
+        return buf.getvalue()
     
     def _comprehensive_cross_reference(self) -> str:
         """Provide comprehensive cross-reference analysis"""
         
-        results = []
-        results.append("📊 COMPREHENSIVE CROSS-REFERENCE ANALYSIS")
-        results.append("=" * 80)
-        
-        # Summary statistics
-        tower_devices = set()
-        cdr_devices = set()
-        ipdr_devices = set()
-        
-        # Collect devices from each source
-        for dump_id, df in self.tower_dump_data.items():
-            if 'mobile_number' in df.columns:
-                tower_devices.update(df['mobile_number'].unique())
+        buf = io.StringIO()
+        buf.write("📊 COMPREHENSIVE CROSS-REFERENCE ANALYSIS\n")
+        buf.write("=" * 80 + "\n")
         
-        for suspect, df in self.cdr_data.items():
-            if 'a_party' in df.columns:
-                cdr_devices.update(df['a_party'].unique())
+        # Summary statistics, from the distinct codes of each source
+        book = self._id_codebook()
+        tower_devices = book['devices']['tower']
+        cdr_devices = book['devices']['cdr']
         
         # Calculate overlaps
-        all_sources = tower_devices & cdr_devices  # Devices in both tower and CDR
-        tower_only = tower_devices - cdr_devices
-        cdr_only = cdr_devices - tower_devices
+        all_sources = np.intersect1d(tower_devices, cdr_devices, assume_unique=True)  # Devices in both tower and CDR
+        tower_only = np.setdiff1d(tower_devices, cdr_devices, assume_unique=True)
+        cdr_only = np.setdiff1d(cdr_devices, tower_devices, assume_unique=True)
         
-        results.append(f"\n📊 DATA SOURCE COVERAGE:")
-        results.append(f"   Tower Dump Devices: {len(tower_devices)}")
-        results.append(f"   CDR Devices: {len(cdr_devices)}")
-        results.append(f"   In Both Sources: {len(all_sources)}")
-        results.append(f"   Tower Only: {len(tower_only)}")
-        results.append(f"   CDR Only: {len(cdr_only)}")
+        buf.write(f"\n📊 DATA SOURCE COVERAGE:\n")
+        buf.write(f"   Tower Dump Devices: {len(tower_devices)}\n")
+        buf.write(f"   CDR Devices: {len(cdr_devices)}\n")
+        buf.write(f"   In Both Sources: {len(all_sources)}\n")
+        buf.write(f"   Tower Only: {len(tower_only)}\n")
+        buf.write(f"   CDR Only: {len(cdr_only)}\n")
         
         # Key findings
-        results.append("\n🎯 KEY CROSS-REFERENCE FINDINGS:")
+        buf.write("\n🎯 KEY CROSS-REFERENCE FINDINGS:\n")
         
         # Silent devices
         if len(tower_only) > 0:
-            results.append(f"\n  🔇 Silent Devices: {len(tower_only)}")
-            results.append("     Present in area but no communication records")
+            buf.write(f"\n  🔇 Silent Devices: {len(tower_only)}\n")
+            buf.write("     Present in area but no communication records\n")
         
         # Ghost callers
         if len(cdr_only) > 0:
-            results.append(f"\n  👻 Ghost Callers: {len(cdr_only)}")
-            results.append("     Made calls but not in tower dump")
+            buf.write(f"\n  👻 Ghost Callers: {len(cdr_only)}\n")
+            buf.write("     Made calls but not in tower dump\n")
         
         # Active communicators
         if len(all_sources) > 0:
-            results.append(f"\n  📞 Active Communicators: {len(all_sources)}")
-            results.append("     Present in area and making calls")
+            buf.write(f"\n  📞 Active Communicators: {len(all_sources)}\n")
+            buf.write("     Present in area and making calls\n")
         
-        return "\n".join(results)
\ No newline at end of file
+        return buf.getvalue()
\ No newline at end of file